@@ -21,8 +21,11 @@ def load_config(config_path='crawler_config.ini'):
         'request_delay': float(config.get('CRAWL_SETTINGS', 'REQUEST_DELAY', fallback='1')),
         'page_timeout': int(config.get('CRAWL_SETTINGS', 'PAGE_TIMEOUT', fallback='15000')),
         'delay_before_return': float(config.get('CRAWL_SETTINGS', 'DELAY_BEFORE_RETURN', fallback='2.0')),
+        'frame_concurrency': int(config.get('CRAWL_SETTINGS', 'FRAME_CONCURRENCY', fallback='8')),
+        'trust_http_charset': config.getboolean('CRAWL_SETTINGS', 'TRUST_HTTP_CHARSET', fallback=True),
         'output_dir': config.get('OUTPUT_SETTINGS', 'OUTPUT_DIR', fallback='output'),
         'max_filename_length': int(config.get('OUTPUT_SETTINGS', 'MAX_FILENAME_LENGTH', fallback='50')),
+        'include_raw_html': config.getboolean('OUTPUT_SETTINGS', 'INCLUDE_RAW_HTML', fallback=False),
         'headless': config.getboolean('BROWSER_SETTINGS', 'HEADLESS', fallback=True),
         'user_agent': config.get('BROWSER_SETTINGS', 'USER_AGENT', fallback='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'),
         'skip_extensions': config.get('FILTERING', 'SKIP_EXTENSIONS', fallback='.pdf,.doc,.docx,.xls,.xlsx,.ppt,.pptx,.zip,.rar,.exe').split(','),
@@ -4,11 +4,15 @@ Hugo Content Generator
 Generates Hugo markdown files from the extracted JSON data
 """
 
+import hashlib
 import json
+import os
 import re
 from pathlib import Path
 import logging
-from datetime import datetime
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 import html
 import urllib.parse
 
@@ -16,13 +20,38 @@ import urllib.parse
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Number of content items rendered per worker task
+RENDER_CHUNK_SIZE = 256
+
+# Sidecar file (in the Hugo site root) holding hashes of the rendered content files
+CONTENT_HASHES_FILE = ".content_hashes.json"
+
+def _render_chunk(hugo_dir, build_date, content_hashes, indexed_items):
+    """Render a chunk of (index, item) pairs in a worker process"""
+    generator = HugoContentGenerator(hugo_dir=hugo_dir)
+    # Every file of a run gets the parent's date, even if a worker starts after midnight
+    generator.build_date = build_date
+    generator.content_hashes = dict(content_hashes)
+    success_count = generator.render_items(indexed_items)
+    
+    # Only send back the hashes that changed in this chunk
+    updated_hashes = {path: digest for path, digest in generator.content_hashes.items()
+                      if content_hashes.get(path) != digest}
+    return success_count, updated_hashes
+
 class HugoContentGenerator:
-    def __init__(self, json_file="extracted_content.json", hugo_dir="orthodox-china"):
+    def __init__(self, json_file="extracted_content.json", hugo_dir="orthodox-china", max_workers=None):
         self.json_file = json_file
         self.hugo_dir = Path(hugo_dir)
         self.content_dir = self.hugo_dir / "content"
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.content_hashes_file = self.hugo_dir / CONTENT_HASHES_FILE
+        self.content_hashes = {}
         self.data = []
         
+        # Date written into the front matter of every generated file
+        self.build_date = time.strftime('%Y-%m-%d')
+        
         # Russian menu translations
         self.menu_translations = {
             "News": "Новости",
@@ -59,6 +88,25 @@ class HugoContentGenerator:
             return False
         return True
     
+    def load_content_hashes(self):
+        """Load hashes of previously rendered content files"""
+        try:
+            with open(self.content_hashes_file, 'r', encoding='utf-8') as f:
+                self.content_hashes = json.load(f)
+        except FileNotFoundError:
+            self.content_hashes = {}
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable hash index {self.content_hashes_file}: {e}")
+            self.content_hashes = {}
+    
+    def save_content_hashes(self):
+        """Save hashes of the rendered content files for the next run"""
+        try:
+            with open(self.content_hashes_file, 'w', encoding='utf-8') as f:
+                json.dump(self.content_hashes, f, indent=0, sort_keys=True)
+        except Exception as e:
+            logger.error(f"Failed to save hash index {self.content_hashes_file}: {e}")
+    
     def sanitize_filename(self, text):
         """Create a safe filename from text"""
         if not text:
@@ -169,36 +217,38 @@ class HugoContentGenerator:
         }
         return weights.get(category, 99)
     
+    def content_file_path(self, item):
+        """Get the path of the Hugo content file an item is rendered to"""
+        category_path = self.get_category_path(item.get('category', 'Other'))
+        original_url = item.get('original_url', '')
+        
+        # Create filename based on URL instead of title
+        if original_url:
+            safe_filename = self.url_to_filename(original_url)
+        else:
+            # Fallback to title if no URL is available
+            safe_filename = self.sanitize_filename(item.get('title', 'Без названия'))
+            
+        return self.content_dir / category_path / f"{safe_filename}.md"
+    
     def create_content_file(self, item, index):
         """Create a Hugo content file from an item"""
-        category = item.get('category', 'Other')
         title = item.get('title', 'Без названия')
         original_url = item.get('original_url', '')
         
         # Create directory structure
-        category_path = self.get_category_path(category)
-        content_path = self.content_dir / category_path
-        content_path.mkdir(parents=True, exist_ok=True)
+        file_path = self.content_file_path(item)
+        file_path.parent.mkdir(parents=True, exist_ok=True)
         
         # Prepare content
         html_content = item.get('html_content', '')
         clean_text = item.get('clean_text', '')
         parent_url = item.get('parent_url', '')
         
-        # Create filename based on URL instead of title
-        if original_url:
-            safe_filename = self.url_to_filename(original_url)
-        else:
-            # Fallback to title if no URL is available
-            safe_filename = self.sanitize_filename(title)
-            
-        filename = f"{safe_filename}.md"
-        file_path = content_path / filename
-        
         # Create front matter - no menu entries for individual articles
         front_matter = f"""---
 title: "{self.escape_yaml_string(title)}"
-date: {datetime.now().strftime('%Y-%m-%d')}
+date: {self.build_date}
 draft: false
 weight: {index}
 bookToc: true
@@ -232,15 +282,55 @@ bookHidden: true
         else:
             content += "<p>Содержимое недоступно</p>"
         
+        # Skip the write if the file on disk was rendered from identical content
+        relative_path = file_path.relative_to(self.content_dir).as_posix()
+        content_hash = hashlib.blake2b(content.encode('utf-8'), digest_size=16).hexdigest()
+        if self.content_hashes.get(relative_path) == content_hash and file_path.exists():
+            logger.debug(f"Unchanged {file_path}")
+            return True
+        
         # Write file
         try:
             with open(file_path, 'w', encoding='utf-8') as f:
                 f.write(content)
+            self.content_hashes[relative_path] = content_hash
             logger.debug(f"Created {file_path}")
             return True
         except Exception as e:
             logger.error(f"Failed to create {file_path}: {e}")
             return False
+
+    def chunk_items(self, indexed_items):
+        """
+        Split (index, item) pairs into chunks for the worker processes
+        
+        Items rendered to the same file (e.g. URLs that only differ in
+        characters the filename drops) are kept in one chunk, in their
+        original order, so the last one wins as in a sequential run and
+        the merged content hashes match the files on disk.
+        """
+        items_by_path = {}
+        for index, item in indexed_items:
+            items_by_path.setdefault(self.content_file_path(item), []).append((index, item))
+        
+        chunks = []
+        chunk = []
+        for path_items in items_by_path.values():
+            if chunk and len(chunk) + len(path_items) > RENDER_CHUNK_SIZE:
+                chunks.append(chunk)
+                chunk = []
+            chunk.extend(path_items)
+        if chunk:
+            chunks.append(chunk)
+        return chunks
+    
+    def render_items(self, indexed_items):
+        """Create content files for (index, item) pairs, returning the success count"""
+        success_count = 0
+        for index, item in indexed_items:
+            if self.create_content_file(item, index):
+                success_count += 1
+        return success_count
     
     def create_section_index_files(self):
         """Create _index.md files for each section"""
@@ -440,12 +530,24 @@ bookToc: false
         # Create section index files
         self.create_section_index_files()
         
-        # Create individual content files
-        success_count = 0
-        for index, item in enumerate(self.data, 1):
-            if self.create_content_file(item, index):
-                success_count += 1
+        # Create individual content files, spreading chunks over worker processes
+        self.load_content_hashes()
+        indexed_items = list(enumerate(self.data, 1))
+        chunks = self.chunk_items(indexed_items) if self.max_workers > 1 else [indexed_items]
+        
+        if len(chunks) > 1:
+            workers = min(self.max_workers, len(chunks))
+            logger.info(f"Rendering {len(chunks)} chunks with {workers} worker processes")
+            success_count = 0
+            render = partial(_render_chunk, self.hugo_dir, self.build_date, self.content_hashes)
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                for chunk_success, updated_hashes in executor.map(render, chunks):
+                    success_count += chunk_success
+                    self.content_hashes.update(updated_hashes)
+        else:
+            success_count = self.render_items(indexed_items)
         
+        self.save_content_hashes()
         logger.info(f"Successfully created {success_count}/{len(self.data)} content files")
         
     def print_statistics(self):
@@ -4,27 +4,150 @@ Link Fixer for Hugo Content - Improved Version
 Fixes internal links in Hugo markdown files by mapping original URLs to new Hugo URLs
 """
 
+import html
 import json
 import re
 from pathlib import Path
 import logging
+from concurrent.futures import ProcessPoolExecutor
 from urllib.parse import urljoin, urlparse, urlunparse
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
 import os
 
 from link_extractor import normalize_url_path
+from utils import iter_lxml_elements, lxml_html, parse_lxml_html
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Front matter field written by hugo_generator for every content file
+_ORIGINAL_URL_RE = re.compile(r'original_url:\s*"([^"]+)"')
+
+# Characters read from the top of a content file to find its front matter
+FRONT_MATTER_MAX_CHARS = 8192
+
+# Leading "../" segments of hrefs resolved without a page URL
+_PARENT_DIRS_RE = re.compile(r'^(?:\.\./)+')
+
+# Hrefs that urljoin/normalize_url_path would change beyond appending them
+# to the current page's directory: dot segments, repeated slashes, escapes,
+# path parameters, stripped whitespace, and anything absolute, scheme-like
+# or query/fragment-only
+_NEEDS_NORM = re.compile(r'(?:^|/)\.\.?(?:[/?#;]|$)|//|%[0-9A-Fa-f]{2}|^[/?#\\\s]|[:;\t\r\n]|\s$')
+
+# Only anchors are rewritten, so the scan pass skips building the rest of the tree
+_A_HREF_ONLY = SoupStrainer('a', href=True)
+
+# The href attribute of an <a> start tag: (everything before the value, value).
+# Earlier attribute values are matched as quoted strings so a '>' inside
+# them does not end the tag.
+_A_HREF_ATTR_RE = re.compile(
+    r'''(<a\b(?:[^>"']|"[^"]*"|'[^']*')*?\shref\s*=\s*)("[^"]*"|'[^']*'|[^\s"'=<>`]+)''', re.I)
+
+def _read_front_matter(path, max_chars=FRONT_MATTER_MAX_CHARS):
+    """Read the front matter at the top of a markdown file
+
+    Returns the front matter text and, when the whole file fit within
+    max_chars, the complete content (otherwise None).
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        head = f.read(max_chars)
+    content = head if len(head) < max_chars else None
+
+    if not head.startswith('---'):
+        return '', content
+    end = head.find('\n---', 3)
+    return (head[3:end] if end != -1 else head[3:]), content
+
+def _normalize_path_segments(href):
+    """Resolve '.', '..' and empty segments in a relative href, keeping any query or fragment"""
+    split_at = len(href)
+    for delimiter in ('?', '#'):
+        position = href.find(delimiter)
+        if position != -1 and position < split_at:
+            split_at = position
+    path, suffix = href[:split_at], href[split_at:]
+
+    parts = []
+    for segment in path.split('/'):
+        if segment == '..':
+            if parts:
+                parts.pop()
+        elif segment and segment != '.':
+            parts.append(segment)
+
+    normalized = '/'.join(parts)
+    # Keep a trailing slash on directory links, as normalize_url_path does
+    if normalized and path.endswith('/'):
+        normalized += '/'
+    return normalized + suffix
+
+# Number of files handed to a worker process at a time
+FIX_CHUNK_SIZE = 64
+
+# Fixer instance with the URL mapping, installed once per worker process
+_worker_fixer = None
+
+def _init_fix_worker(fixer):
+    """Install the fixer shared by all tasks of a worker process"""
+    global _worker_fixer
+    _worker_fixer = fixer
+
+def _fix_file_in_worker(task):
+    """Fix one (md_file, original_url, content) task in a worker process"""
+    return _worker_fixer.fix_file(*task)
+
 class ImprovedLinkFixer:
-    def __init__(self, json_file="extracted_content.json", hugo_dir="orthodox-china"):
+    def __init__(self, json_file="extracted_content.json", hugo_dir="orthodox-china", max_workers=None):
         self.json_file = json_file
         self.hugo_dir = Path(hugo_dir)
         self.content_dir = self.hugo_dir / "content"
+        self.max_workers = max_workers or os.cpu_count() or 1
         self.url_mapping = {}
         self.base_url = "https://orthodox.cn/"
+        # original_url -> (hugo_url, md_file), built once from the front matter
+        # (None until the content directory has been indexed)
+        self._url_to_hugo = None
+        # md_file -> content of small files read while indexing, consumed by fix_all_hugo_files
+        self._file_cache = {}
+        # Trie over reversed url_mapping path segments for links fixed without context
+        self._suffix_trie = {}
+        # current page URL -> its normalized directory relative to base_url
+        self._page_dirs = {}
+        # (current page URL, href) -> normalized path for hrefs needing full resolution
+        self._norm_cache = {}
+
+    def _build_reverse_index(self):
+        """Index all Hugo files by the original_url in their front matter in a single pass"""
+        self._url_to_hugo = {}
+        self._file_cache = {}
+
+        for md_file in self.content_dir.rglob("*.md"):
+            try:
+                front_matter, content = _read_front_matter(md_file)
+            except Exception as e:
+                logger.warning(f"Error reading {md_file}: {e}")
+                continue
+
+            match = _ORIGINAL_URL_RE.search(front_matter)
+            if not match:
+                continue
+
+            # Small files were read completely; larger ones are read again when fixed
+            if content is not None:
+                self._file_cache[md_file] = content
+
+            # Convert file path to Hugo URL
+            relative_path = md_file.relative_to(self.content_dir)
+            # Remove .md extension and convert to URL path
+            url_path = str(relative_path.with_suffix(''))
+            hugo_url = '/' + url_path.replace('\\', '/') + '/'
+
+            # Keep the first file found for a URL, like the previous linear search did
+            self._url_to_hugo.setdefault(match.group(1), (hugo_url, md_file))
+
+        logger.info(f"Indexed {len(self._url_to_hugo)} Hugo files by original URL")
 
     def load_data_and_build_mapping(self):
         """Load extracted data and build URL mapping"""
@@ -33,6 +156,8 @@ class ImprovedLinkFixer:
         with open(self.json_file, 'r', encoding='utf-8') as f:
             data = json.load(f)
 
+        self._build_reverse_index()
+
         # Build mapping from original URLs to Hugo file paths
         for item in data:
             original_url = item.get('original_url', '')
@@ -51,115 +176,169 @@ class ImprovedLinkFixer:
                 # Find corresponding Hugo file
                 hugo_path = self.find_hugo_file_for_url(original_url)
                 if hugo_path:
-                    self.url_mapping[relative_original] = hugo_path
-
-                    # Also map variations of the URL
-                    # Handle URLs with and without leading slashes
-                    if not relative_original.startswith('/'):
-                        self.url_mapping['/' + relative_original] = hugo_path
+                    # Keys are stored without a leading slash; lookups strip it too
+                    self.url_mapping[relative_original.lstrip('/')] = hugo_path
 
                     # Map the original (non-normalized) version too
                     if original_url.startswith(self.base_url):
-                        original_relative = original_url[len(self.base_url):]
+                        original_relative = original_url[len(self.base_url):].lstrip('/')
                         if original_relative != relative_original:
                             self.url_mapping[original_relative] = hugo_path
-                            if not original_relative.startswith('/'):
-                                self.url_mapping['/' + original_relative] = hugo_path
+
+        self._build_suffix_trie()
 
         logger.info(f"Built URL mapping with {len(self.url_mapping)} entries")
         return data
 
-    def find_hugo_file_for_url(self, original_url):
-        """Find the Hugo markdown file that corresponds to an original URL"""
-        # Search through all Hugo content files
-        for md_file in self.content_dir.rglob("*.md"):
-            try:
-                with open(md_file, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                    # Look for the original_url in the front matter
-                    if f'original_url: "{original_url}"' in content:
-                        # Convert file path to Hugo URL
-                        relative_path = md_file.relative_to(self.content_dir)
-                        # Remove .md extension and convert to URL path
-                        url_path = str(relative_path.with_suffix(''))
-                        return '/' + url_path.replace('\\', '/') + '/'
-            except Exception as e:
-                logger.warning(f"Error reading {md_file}: {e}")
-                continue
-
+    def _build_suffix_trie(self):
+        """Index url_mapping in a trie keyed on reversed path segments"""
+        self._suffix_trie = {}
+
+        # Iterate in mapping order so the first entry wins, like the linear scan did
+        for original_path, hugo_path in self.url_mapping.items():
+            node = self._suffix_trie
+            for segment in reversed(original_path.strip('/').split('/')):
+                node = node.setdefault(segment, {})
+                # Every node keeps a Hugo URL for the paths ending in its suffix
+                node.setdefault(None, hugo_path)
+
+    def find_partial_match(self, clean_href):
+        """Find the Hugo URL of the mapped path sharing the longest path suffix with clean_href"""
+        segments = clean_href.strip('/').split('/')
+        node = self._suffix_trie
+        depth = 0
+        for segment in reversed(segments):
+            child = node.get(segment)
+            if child is None:
+                break
+            node = child
+            depth += 1
+
+        if depth == len(segments):
+            return node.get(None)
+        # Ambiguous deeper path: fall back to the deepest shared suffix
+        if depth and len(segments) > 1:
+            return node[None]
         return None
 
+    def find_hugo_file_for_url(self, original_url):
+        """Find the Hugo URL of the markdown file that corresponds to an original URL"""
+        if self._url_to_hugo is None:
+            self._build_reverse_index()
+        return self._url_to_hugo.get(original_url, (None,))[0]
+
+    def _is_internal_href(self, href):
+        """Check whether an href can point to another page of the site"""
+        # Skip external links, anchors, and mailto links
+        return not href.startswith(('http://', 'https://', '#', 'mailto:', 'javascript:'))
+
+    def _iter_anchor_hrefs(self, html_content):
+        """Yield the href of every <a> tag in the HTML"""
+        root = parse_lxml_html(html_content)
+        if root is not None:
+            for link in iter_lxml_elements(root, 'a'):
+                href = link.get('href')
+                if href is not None:
+                    yield href
+        elif lxml_html is None:
+            scan = BeautifulSoup(html_content, 'html.parser', parse_only=_A_HREF_ONLY)
+            for link in scan.find_all('a', href=True):
+                yield link['href']
+
+    def _rewrite_links(self, html_content, resolve):
+        """Replace the hrefs of <a> tags that resolve to a Hugo URL
+
+        Hrefs are collected from a parsed tree, then only their attribute
+        values are replaced in the original text so the rest of the markup
+        is left exactly as written. Returns the rewritten HTML and the
+        number of links fixed.
+        """
+        resolved = {}
+        for href in self._iter_anchor_hrefs(html_content):
+            if href not in resolved and self._is_internal_href(href):
+                resolved[href] = resolve(href)
+
+        if not any(resolved.values()):
+            return html_content, 0
+
+        links_fixed = 0
+
+        def replace_href(match):
+            nonlocal links_fixed
+            value = match.group(2)
+            if value[:1] in ('"', "'"):
+                value = value[1:-1]
+            hugo_url = resolved.get(html.unescape(value))
+            if not hugo_url or hugo_url == value:
+                return match.group(0)
+            links_fixed += 1
+            return f'{match.group(1)}"{html.escape(hugo_url)}"'
+
+        return _A_HREF_ATTR_RE.sub(replace_href, html_content), links_fixed
+
+    def resolve_without_context(self, href):
+        """Find the Hugo URL for an href on a page whose original URL is unknown"""
+        # Clean the href by removing leading parent directory references and normalize
+        clean_href = _PARENT_DIRS_RE.sub('', href)
+
+        # Apply comprehensive URL normalization to the cleaned href
+        if clean_href.startswith('/'):
+            # Absolute path - normalize it
+            normalized_href = normalize_url_path(self.base_url + clean_href.lstrip('/'))
+            if normalized_href.startswith(self.base_url):
+                clean_href = normalized_href[len(self.base_url):]
+        else:
+            # Relative path - resolve its path segments directly
+            clean_href = _normalize_path_segments(clean_href)
+
+        # Try exact match first
+        clean_href = clean_href.lstrip('/')
+        hugo_url = self.url_mapping.get(clean_href)
+        if not hugo_url:
+            # Try partial matching for complex relative paths
+            hugo_url = self.find_partial_match(clean_href)
+
+        if hugo_url:
+            logger.debug(f"Fixed link (no context): {href} -> {hugo_url}")
+        return hugo_url
+
     def fix_links_without_context(self, html_content):
-        """Fix internal links when we don't have the original URL context"""
+        """Fix internal links when we don't have the original URL context
+
+        Returns the HTML (unchanged if nothing was fixed) and the number of links fixed.
+        """
         if not html_content:
-            return html_content
+            return html_content, 0
 
         try:
-            soup = BeautifulSoup(html_content, 'html.parser')
-            links_fixed = 0
-
-            # Find all anchor tags with href attributes
-            for link in soup.find_all('a', href=True):
-                href = link['href']
-
-                # Skip external links, anchors, and mailto links
-                if (href.startswith('http://') or href.startswith('https://') or
-                    href.startswith('#') or href.startswith('mailto:') or
-                    href.startswith('javascript:')):
-                    continue
-
-                # Try to match common patterns and fix them
-                hugo_url = None
-
-                # Clean the href by removing relative path indicators and normalize
-                clean_href = href.lstrip('../')
-
-                # Apply comprehensive URL normalization to the cleaned href
-                if clean_href.startswith('/'):
-                    # Absolute path - normalize it
-                    normalized_href = normalize_url_path(self.base_url + clean_href.lstrip('/'))
-                    if normalized_href.startswith(self.base_url):
-                        clean_href = normalized_href[len(self.base_url):]
-                else:
-                    # Relative path - create a dummy URL to normalize path segments
-                    dummy_url = f"https://example.com/{clean_href}"
-                    normalized_dummy = normalize_url_path(dummy_url)
-                    clean_href = normalized_dummy.replace("https://example.com/", "")
-
-                # Try exact match first
-                if clean_href in self.url_mapping:
-                    hugo_url = self.url_mapping[clean_href]
-                elif ('/' + clean_href) in self.url_mapping:
-                    hugo_url = self.url_mapping['/' + clean_href]
-                else:
-                    # Try partial matching for complex relative paths
-                    for original_path, hugo_path in self.url_mapping.items():
-                        if clean_href in original_path or original_path.endswith(clean_href):
-                            hugo_url = hugo_path
-                            break
-                        # Also try matching the filename part
-                        if '/' in clean_href:
-                            filename = clean_href.split('/')[-1]
-                            if filename in original_path and original_path.endswith(filename):
-                                hugo_url = hugo_path
-                                break
-
-                if hugo_url:
-                    link['href'] = hugo_url
-                    links_fixed += 1
-                    logger.debug(f"Fixed link (no context): {href} -> {hugo_url}")
+            fixed_html, links_fixed = self._rewrite_links(html_content, self.resolve_without_context)
 
             if links_fixed > 0:
                 logger.info(f"Fixed {links_fixed} internal links without context")
 
-            return str(soup)
+            return fixed_html, links_fixed
 
         except Exception as e:
             logger.error(f"Error fixing links without context: {e}")
-            return html_content
+            return html_content, 0
 
     def normalize_relative_url(self, href, current_page_url):
         """Normalize a relative URL based on the current page's original URL"""
+        # Plain relative hrefs on site pages resolve to the page's directory plus the href
+        if href and current_page_url.startswith(self.base_url) and not _NEEDS_NORM.search(href):
+            page_dir = self._page_dirs.get(current_page_url)
+            if page_dir is None:
+                page_dir = self._page_dirs[current_page_url] = self._normalize_full('.', current_page_url)
+            return page_dir + href
+
+        key = (current_page_url, href)
+        normalized = self._norm_cache.get(key)
+        if normalized is None:
+            normalized = self._norm_cache[key] = self._normalize_full(href, current_page_url)
+        return normalized
+
+    def _normalize_full(self, href, current_page_url):
+        """Resolve href against the page URL with urljoin and normalize_url_path"""
         try:
             # Join the relative URL with the current page's base URL
             full_url = urljoin(current_page_url, href)
@@ -179,61 +358,91 @@ class ImprovedLinkFixer:
             logger.warning(f"Error normalizing URL {href} from {current_page_url}: {e}")
             return href
 
-    def fix_links_in_html(self, html_content, current_page_original_url):
-        """Fix internal links in HTML content"""
-        if not html_content:
-            return html_content
-
-        try:
-            soup = BeautifulSoup(html_content, 'html.parser')
-            links_fixed = 0
+    def resolve_in_context(self, href, current_page_original_url):
+        """Find the Hugo URL for an href on the page with the given original URL"""
+        # Normalize the relative URL to get the full original path
+        normalized_href = self.normalize_relative_url(href, current_page_original_url)
 
-            # Find all anchor tags with href attributes
-            for link in soup.find_all('a', href=True):
-                href = link['href']
+        # Check if we have a mapping for this URL
+        hugo_url = self.url_mapping.get(normalized_href.lstrip('/'))
 
-                # Skip external links, anchors, and mailto links
-                if (href.startswith('http://') or href.startswith('https://') or
-                    href.startswith('#') or href.startswith('mailto:') or
-                    href.startswith('javascript:')):
-                    continue
+        if hugo_url:
+            logger.debug(f"Fixed link: {href} -> {hugo_url}")
+        else:
+            logger.debug(f"No mapping found for: {href} (normalized: {normalized_href})")
+        return hugo_url
 
-                # Normalize the relative URL to get the full original path
-                normalized_href = self.normalize_relative_url(href, current_page_original_url)
+    def fix_links_in_html(self, html_content, current_page_original_url):
+        """Fix internal links in HTML content
 
-                # Check if we have a mapping for this URL
-                hugo_url = None
+        Returns the HTML (unchanged if nothing was fixed) and the number of links fixed.
+        """
+        if not html_content:
+            return html_content, 0
 
-                # Try exact match first
-                if normalized_href in self.url_mapping:
-                    hugo_url = self.url_mapping[normalized_href]
-                else:
-                    # Try with leading slash
-                    if ('/' + normalized_href) in self.url_mapping:
-                        hugo_url = self.url_mapping['/' + normalized_href]
-                    else:
-                        # Try without leading slash
-                        clean_href = normalized_href.lstrip('/')
-                        if clean_href in self.url_mapping:
-                            hugo_url = self.url_mapping[clean_href]
-
-                if hugo_url:
-                    link['href'] = hugo_url
-                    links_fixed += 1
-                    logger.debug(f"Fixed link: {href} -> {hugo_url}")
-                else:
-                    logger.debug(f"No mapping found for: {href} (normalized: {normalized_href})")
+        try:
+            fixed_html, links_fixed = self._rewrite_links(
+                html_content, lambda href: self.resolve_in_context(href, current_page_original_url))
 
             if links_fixed > 0:
                 logger.info(f"Fixed {links_fixed} internal links")
 
-            return str(soup)
+            return fixed_html, links_fixed
 
         except Exception as e:
             logger.error(f"Error fixing links in HTML: {e}")
-            return html_content
-            return html_content
+            return html_content, 0
     
+    def fix_file(self, md_file, original_url=None, content=None):
+        """Fix internal links in one Hugo markdown file
+
+        Returns True if the file was rewritten, False if it needed no
+        changes and None if it could not be processed.
+        """
+        try:
+            if content is None:
+                with open(md_file, 'r', encoding='utf-8') as f:
+                    content = f.read()
+            
+            # Slice front matter and content at the --- fences
+            if not content.startswith('---'):
+                return False
+            end = content.find('\n---', 3)
+            if end == -1:
+                return False
+
+            front_matter = content[3:end + 1]
+            html_content = content[end + 4:]
+            
+            # Get the original URL for this file
+            if not original_url:
+                # Try to extract from front matter
+                original_url_match = _ORIGINAL_URL_RE.search(front_matter)
+                if original_url_match:
+                    original_url = original_url_match.group(1)
+            
+            # Fix links in the HTML content
+            if original_url:
+                fixed_html, links_fixed = self.fix_links_in_html(html_content, original_url)
+            else:
+                # For files without original_url, try pattern matching
+                fixed_html, links_fixed = self.fix_links_without_context(html_content)
+            
+            if not links_fixed:
+                return False
+
+            # Write back the fixed content
+            new_content = f"---{front_matter}---{fixed_html}"
+            with open(md_file, 'w', encoding='utf-8') as f:
+                f.write(new_content)
+            context_type = "with context" if original_url else "without context"
+            logger.info(f"Fixed links ({context_type}) in: {md_file.relative_to(self.content_dir)}")
+            return True
+            
+        except Exception as e:
+            logger.error(f"Error processing {md_file}: {e}")
+            return None
+
     def fix_all_hugo_files(self):
         """Fix internal links in all Hugo markdown files"""
         logger.info("Starting to fix internal links in Hugo files...")
@@ -241,63 +450,31 @@ class ImprovedLinkFixer:
         data = self.load_data_and_build_mapping()
         
         # Create a mapping from Hugo files to original URLs for context
-        file_to_original_url = {}
-        for item in data:
-            original_url = item.get('original_url', '')
-            if original_url:
-                hugo_path = self.find_hugo_file_for_url(original_url)
-                if hugo_path:
-                    # Convert Hugo URL back to file path
-                    file_path = self.content_dir / (hugo_path.strip('/') + '.md')
-                    file_to_original_url[file_path] = original_url
+        file_to_original_url = {
+            md_file: original_url
+            for original_url, (_, md_file) in self._url_to_hugo.items()
+        }
         
-        total_files = 0
-        files_with_fixes = 0
+        # (md_file, original_url, content read while indexing) for every page;
+        # popping the cache releases it and keeps it out of the worker state
+        tasks = [
+            (md_file, file_to_original_url.get(md_file), self._file_cache.pop(md_file, None))
+            for md_file in self.content_dir.rglob("*.md")
+            if not md_file.name.startswith('_index.md')  # Skip index files
+        ]
+        self._file_cache.clear()
         
-        # Process all markdown files
-        for md_file in self.content_dir.rglob("*.md"):
-            if md_file.name.startswith('_index.md'):
-                continue  # Skip index files
-                
-            try:
-                with open(md_file, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                
-                # Split front matter and content
-                parts = content.split('---', 2)
-                if len(parts) >= 3:
-                    front_matter = parts[1]
-                    html_content = parts[2]
-                    
-                    # Get the original URL for this file
-                    original_url = file_to_original_url.get(md_file)
-                    if not original_url:
-                        # Try to extract from front matter
-                        original_url_match = re.search(r'original_url:\s*"([^"]+)"', front_matter)
-                        if original_url_match:
-                            original_url = original_url_match.group(1)
-                    
-                    # Fix links in the HTML content
-                    original_html = html_content
-                    if original_url:
-                        fixed_html = self.fix_links_in_html(html_content, original_url)
-                    else:
-                        # For files without original_url, try pattern matching
-                        fixed_html = self.fix_links_without_context(html_content)
-                    
-                    if fixed_html != original_html:
-                        # Write back the fixed content
-                        new_content = f"---{front_matter}---{fixed_html}"
-                        with open(md_file, 'w', encoding='utf-8') as f:
-                            f.write(new_content)
-                        files_with_fixes += 1
-                        context_type = "with context" if original_url else "without context"
-                        logger.info(f"Fixed links ({context_type}) in: {md_file.relative_to(self.content_dir)}")
-                
-                total_files += 1
-                
-            except Exception as e:
-                logger.error(f"Error processing {md_file}: {e}")
+        if len(tasks) > FIX_CHUNK_SIZE and self.max_workers > 1:
+            workers = min(self.max_workers, -(-len(tasks) // FIX_CHUNK_SIZE))
+            logger.info(f"Fixing {len(tasks)} files with {workers} worker processes")
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_fix_worker,
+                                     initargs=(self,)) as executor:
+                results = list(executor.map(_fix_file_in_worker, tasks, chunksize=FIX_CHUNK_SIZE))
+        else:
+            results = [self.fix_file(*task) for task in tasks]
+        
+        total_files = sum(1 for result in results if result is not None)
+        files_with_fixes = sum(1 for result in results if result)
         
         logger.info(f"Processed {total_files} files, fixed links in {files_with_fixes} files")
         
@@ -1,9 +1,65 @@
 """
 Language detection module for the crawler
 """
+import html
+import logging
+import os
 import re
+from collections import OrderedDict
 from langdetect import detect, LangDetectException
-from bs4 import BeautifulSoup
+
+logger = logging.getLogger(__name__)
+
+# Optional: fastText's compact language ID model is much faster than
+# langdetect. Install fasttext and place lid.176.ftz next to this module
+# (or point LID_MODEL_PATH at it) to use it; otherwise langdetect is used.
+try:
+    import fasttext
+except ImportError:
+    fasttext = None
+
+LID_MODEL_PATH = os.environ.get(
+    'LID_MODEL_PATH', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'lid.176.ftz'))
+
+_lid_model = None
+_lid_unavailable = fasttext is None
+
+# Detection results by page content; frames such as navigation bars come
+# back with identical HTML for every page that embeds them. Keyed by the
+# content's hash and length so the pages themselves aren't kept alive.
+_detected_languages = OrderedDict()
+DETECTED_LANGUAGES_SIZE = 2048
+
+# HTML lang attributes and charset declarations indicating Chinese
+_CHINESE_LANG_RE = re.compile(r'lang\s*=\s*["\']?(zh|chinese)', re.IGNORECASE)
+_CHINESE_CHARSET_RE = re.compile(r'charset\s*=\s*["\']?(gb2312|gbk|gb18030|big5)', re.IGNORECASE)
+
+# Chinese-specific HTML entities or Unicode ranges
+_CHINESE_ENTITY_RES = (
+    re.compile(r'&#x[4-9][0-9a-f]{3};', re.IGNORECASE),  # Chinese Unicode range (rough approximation)
+    re.compile(r'&#[2-4][0-9]{4};', re.IGNORECASE),      # Chinese decimal entities
+    re.compile(r'&[a-z]+;.*?&#x[4-9]', re.IGNORECASE),   # Mixed entities with Chinese
+)
+
+# Markup removed before detection: comments, script/style blocks, then tags
+_MARKUP_RE = re.compile(r'<!--.*?-->|<(script|style)\b[^>]*>.*?</\1\s*>|<[^>]+>', re.S | re.I)
+
+# Text cleanup before detection
+_URL_RE = re.compile(r'https?://\S+|www\.\S+')
+_EMAIL_RE = re.compile(r'\S+@\S+')
+_DIGIT_RE = re.compile(r'\d+')
+_PUNCT_RE = re.compile(r'[^\w\s]')
+_WS_RE = re.compile(r'\s+')
+
+# Patterns suggesting Chinese content decoded with the wrong encoding.
+# Only the presence of a run matters, so the repeats are bounded to keep
+# the engine from scanning arbitrarily long runs.
+_CYRILLIC_RE = re.compile(r'[Ё-я]')
+_CORRUPTION_RES = (
+    re.compile(r'[А-Я]{15,200}'),  # Very long sequences of uppercase Cyrillic
+    re.compile(r'[Ё-я]{30,400}'),  # Very long sequences of Cyrillic characters
+    re.compile(r'(?:[А-Я][а-я]){10,50}'),  # Repetitive alternating case patterns
+)
 
 def detect_chinese_content_patterns(html_content):
     """
@@ -16,22 +72,16 @@ def detect_chinese_content_patterns(html_content):
         bool: True if content appears to be Chinese, False otherwise
     """
     # Look for HTML lang attributes indicating Chinese
-    if re.search(r'lang\s*=\s*["\']?(zh|chinese)', html_content, re.IGNORECASE):
+    if _CHINESE_LANG_RE.search(html_content):
         return True
 
     # Look for charset declarations for Chinese encodings
-    if re.search(r'charset\s*=\s*["\']?(gb2312|gbk|gb18030|big5)', html_content, re.IGNORECASE):
+    if _CHINESE_CHARSET_RE.search(html_content):
         return True
 
     # Look for Chinese-specific HTML entities or Unicode ranges
-    chinese_patterns = [
-        r'&#x[4-9][0-9a-f]{3};',  # Chinese Unicode range (rough approximation)
-        r'&#[2-4][0-9]{4};',      # Chinese decimal entities
-        r'&[a-z]+;.*?&#x[4-9]',   # Mixed entities with Chinese
-    ]
-
-    for pattern in chinese_patterns:
-        if re.search(pattern, html_content, re.IGNORECASE):
+    for pattern in _CHINESE_ENTITY_RES:
+        if pattern.search(html_content):
             return True
 
     return False
@@ -51,41 +101,46 @@ def clean_text_for_detection(html_content):
     Returns:
         str: Cleaned text suitable for language detection
     """
-    # Parse HTML
-    soup = BeautifulSoup(html_content, 'html.parser')
-
-    # Remove script and style elements
-    for script in soup(["script", "style"]):
-        script.extract()
-
-    # Get text
-    text = soup.get_text()
+    # Strip script/style content and tags; only the text is needed, so
+    # building a DOM is unnecessary
+    text = html.unescape(_MARKUP_RE.sub(' ', html_content))
 
     # Remove URLs, email addresses, and numbers
-    text = re.sub(r'https?://\S+|www\.\S+', '', text)
-    text = re.sub(r'\S+@\S+', '', text)
-    text = re.sub(r'\d+', '', text)
+    text = _URL_RE.sub('', text)
+    text = _EMAIL_RE.sub('', text)
+    text = _DIGIT_RE.sub('', text)
 
     # Remove special characters and extra whitespace
-    text = re.sub(r'[^\w\s]', ' ', text)
-    text = re.sub(r'\s+', ' ', text).strip()
+    text = _PUNCT_RE.sub(' ', text)
+    text = _WS_RE.sub(' ', text).strip()
 
     # Check for potential encoding corruption patterns
     # These patterns suggest Chinese content decoded with wrong encoding
-    corruption_indicators = [
-        r'[А-Я]{15,}',  # Very long sequences of uppercase Cyrillic
-        r'[Ё-я]{30,}',  # Very long sequences of Cyrillic characters
-        r'([А-Я][а-я]){10,}',  # Repetitive alternating case patterns
-    ]
-
-    for pattern in corruption_indicators:
-        if re.search(pattern, text):
-            print(f"⚠️ Potential encoding corruption detected in text")
-            # Return empty string to force language detection failure
-            return ""
+    # and can only match if the text contains Cyrillic at all
+    if _CYRILLIC_RE.search(text):
+        for pattern in _CORRUPTION_RES:
+            if pattern.search(text):
+                logger.warning("⚠️ Potential encoding corruption detected in text")
+                # Return empty string to force language detection failure
+                return ""
 
     return text
 
+def _get_lid_model():
+    """
+    Load the fastText language ID model on first use
+
+    Returns:
+        fasttext model or None: The model, or None if fasttext or the model file is unavailable
+    """
+    global _lid_model, _lid_unavailable
+    if _lid_model is None and not _lid_unavailable:
+        if os.path.exists(LID_MODEL_PATH):
+            _lid_model = fasttext.load_model(LID_MODEL_PATH)
+        else:
+            _lid_unavailable = True
+    return _lid_model
+
 def detect_language(html_content, min_text_length=50):
     """
     Detect the language of HTML content
@@ -97,22 +152,50 @@ def detect_language(html_content, min_text_length=50):
     Returns:
         str or None: ISO 639-1 language code (e.g., 'en', 'zh', 'ru') or None if detection failed
     """
+    key = (hash(html_content), len(html_content), min_text_length)
+    if key in _detected_languages:
+        _detected_languages.move_to_end(key)
+        return _detected_languages[key]
+
+    language = _detect_language(html_content, min_text_length)
+    _detected_languages[key] = language
+    if len(_detected_languages) > DETECTED_LANGUAGES_SIZE:
+        _detected_languages.popitem(last=False)
+    return language
+
+def _detect_language(html_content, min_text_length):
+    """
+    Detect the language of HTML content, without the result cache
+
+    Args:
+        html_content (str): HTML content to detect language from
+        min_text_length (int): Minimum text length required for reliable detection
+
+    Returns:
+        str or None: ISO 639-1 language code or None if detection failed
+    """
     try:
         # Clean the text for better detection
         clean_text = clean_text_for_detection(html_content)
 
         # Skip if not enough text
         if len(clean_text) < min_text_length:
-            print(f"⚠️ Not enough text for reliable language detection ({len(clean_text)} chars, need {min_text_length})")
+            logger.info("⚠️ Not enough text for reliable language detection (%d chars, need %d)",
+                        len(clean_text), min_text_length)
             return None
 
-        # Detect language
-        language = detect(clean_text)
-        print(f"🔍 Detected language: {language}")
+        # Detect language, preferring the compiled fastText model
+        lid_model = _get_lid_model()
+        if lid_model is not None:
+            labels, _ = lid_model.predict(clean_text.replace('\n', ' '), k=1)
+            language = labels[0].replace('__label__', '')
+        else:
+            language = detect(clean_text)
+        logger.info("🔍 Detected language: %s", language)
         return language
 
     except LangDetectException as e:
-        print(f"❌ Language detection failed: {str(e)}")
+        logger.warning("❌ Language detection failed: %s", e)
         return None
 
 def is_target_language(html_content, target_language, min_text_length=50, is_frame=False):
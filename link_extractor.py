@@ -1,8 +1,97 @@
-from bs4 import BeautifulSoup
-from urllib.parse import urlparse, urlunparse
+from bs4 import BeautifulSoup, SoupStrainer
+from bs4.element import Tag
+from urllib.parse import urljoin, urlparse, urlunparse
+from dataclasses import dataclass
+from functools import lru_cache
+import logging
+import posixpath
 import re
 
-def normalize_url(url, base_url, current_url=None):
+from utils import HTML_PARSER, iter_lxml_elements, lxml_html, parse_lxml_html
+
+logger = logging.getLogger(__name__)
+
+# Tags that can carry links; the rest of the document is not needed
+_LINK_TAGS = SoupStrainer(['a', 'area', 'frame', 'iframe'])
+
+_ABS_SCHEMES = ('http://', 'https://')
+# Placeholder hrefs that never point to a page
+_SKIP_LINKS = frozenset(('#', 'nohref'))
+_MULTI_SLASH_RE = re.compile(r'/+')
+
+# Absolute http(s) URLs that parsing and re-assembling would leave untouched:
+# a host, a path free of ';' and a non-empty query, no fragment and no
+# whitespace or control characters
+_PLAIN_ABS_URL_RE = re.compile(
+    r'https?://[^/?#;\[\]\\\x00-\x20]+(/[^?#;\\\x00-\x20]*)(?:\?[^#\x00-\x20]+)?\Z')
+
+@dataclass(slots=True)
+class Link:
+    """A link found on a page, plus where it was found once the crawler knows"""
+    url: str  # URL without fragment, used for crawling
+    original_url: str  # Normalized URL with fragment, kept for reference
+    text: str
+    parent_frame: int | None = None
+    parent_name: str | None = None
+    parent_url: str | None = None
+    parent_type: str | None = None
+    parent_id: str | None = None
+
+# Relative links that resolve by simple concatenation with the page's directory:
+# no scheme, query, fragment, params, dot segments, empty segments or whitespace
+_SIMPLE_RELATIVE_RE = re.compile(r'(?!\.)(?:[^\x00-\x20:/?#;\\]+/(?![./]))*[^\x00-\x20:/?#;\\]*')
+
+@lru_cache(maxsize=1024)
+def _page_dir(current_url):
+    """
+    Get the directory URL that simple relative links on a page resolve against
+
+    Args:
+        current_url (str): URL of the current page
+
+    Returns:
+        str or None: Directory URL ending in '/', or None if the page URL isn't canonical
+    """
+    if not current_url or not _is_canonical_url(current_url):
+        return None
+    match = _PLAIN_ABS_URL_RE.match(current_url)
+    return current_url[:match.start(1)] + current_url[match.start(1):match.end(1)].rpartition('/')[0] + '/'
+
+@lru_cache(maxsize=65536)
+def _absolute_url(url, base_url, current_url=None, current_dir=None):
+    """
+    Resolve a link to an absolute URL without normalizing its path
+
+    Args:
+        url (str): URL to resolve
+        base_url (str): Base URL of the site
+        current_url (str, optional): URL of the current page
+        current_dir (str, optional): Directory of the current page, as returned by _page_dir
+
+    Returns:
+        str or None: Absolute URL, or None for links that should be ignored
+    """
+    # Skip javascript: and empty links
+    if not url or url in _SKIP_LINKS or url.startswith('javascript:') or (len(url) == 6 and url.lower() == 'nohref'):
+        return None
+    
+    # Already an absolute URL
+    if url.startswith(_ABS_SCHEMES):
+        return url
+    if url.startswith('/'):
+        # Root-relative URL
+        return f"{base_url.rstrip('/')}{url}"
+
+    # Relative URL; plain ones just extend the page's directory
+    if current_dir and _SIMPLE_RELATIVE_RE.fullmatch(url):
+        return current_dir + url
+    if current_url:
+        # Resolve against the current page (handles '..', queries and fragments)
+        return urljoin(current_url, url)
+    return f"{base_url.rstrip('/')}/{url}"
+
+@lru_cache(maxsize=65536)
+def normalize_url(url, base_url, current_url=None, current_dir=None):
     """
     Normalize a URL to an absolute URL with proper path normalization
     
@@ -10,32 +99,69 @@ def normalize_url(url, base_url, current_url=None):
         url (str): URL to normalize
         base_url (str): Base URL of the site
         current_url (str, optional): URL of the current page
+        current_dir (str, optional): Directory of the current page, as returned by _page_dir
         
     Returns:
         str: Normalized URL with resolved path segments and cleaned slashes
     """
-    # Skip javascript: and empty links
-    if url.startswith('javascript:') or not url or url == '#' or url.lower() == 'nohref':
+    absolute_url = _absolute_url(url, base_url, current_url, current_dir)
+    if absolute_url is None:
         return None
     
-    # Already an absolute URL
-    if url.startswith(('http://', 'https://')):
-        absolute_url = url
-    elif url.startswith('/'):
-        # Root-relative URL
-        absolute_url = f"{base_url.rstrip('/')}{url}"
-    else:
-        # Relative URL
-        if current_url:
-            # Get the directory of the current URL
-            current_dir = '/'.join(current_url.split('/')[:-1])
-            absolute_url = f"{current_dir}/{url}"
-        else:
-            absolute_url = f"{base_url.rstrip('/')}/{url}"
-    
     # Now normalize the path segments
     return normalize_url_path(absolute_url)
 
+def _is_canonical_url(url):
+    """
+    Check whether an absolute URL is already normalized and has no fragment
+
+    Args:
+        url (str): URL to check
+
+    Returns:
+        bool: True if normalizing or deduplicating the URL would not change it
+    """
+    match = _PLAIN_ABS_URL_RE.match(url)
+    if match is None:
+        return False
+    path = match.group(1)
+    return ('//' not in path and '/./' not in path and '/../' not in path
+            and not path.endswith(('/.', '/..')))
+
+def _normalize_path(path):
+    """
+    Resolve '..' and '.' segments and multiple slashes in a URL path
+
+    Args:
+        path (str): Path component of a URL
+
+    Returns:
+        str: Normalized absolute path
+    """
+    # Most paths are already canonical: absolute, with no repeated slashes
+    # and no '.' or '..' segments
+    if (path.startswith('/') and '//' not in path and '/./' not in path
+            and '/../' not in path and not path.endswith(('/.', '/..'))):
+        return path
+
+    # Remember if the original path ended with a slash
+    ends_with_slash = path.endswith('/') and len(path) > 1
+
+    # Replace multiple consecutive slashes with single slash; most paths
+    # have none, so check with a plain substring search first
+    if '//' in path:
+        path = _MULTI_SLASH_RE.sub('/', path)
+
+    # Resolve '..' and '.' segments against the root; '..' never climbs above it
+    normalized_path = posixpath.normpath(path if path.startswith('/') else '/' + path)
+
+    # Restore trailing slash if it was present and we have content after root
+    if ends_with_slash and normalized_path != '/':
+        normalized_path += '/'
+
+    return normalized_path
+
+@lru_cache(maxsize=65536)
 def normalize_url_path(url):
     """
     Normalize URL by resolving '..' and '.' path segments and cleaning multiple slashes
@@ -46,62 +172,41 @@ def normalize_url_path(url):
     Returns:
         str: Normalized URL with resolved path segments and cleaned slashes
     """
-    if not url:
+    if not url or _is_canonical_url(url):
         return url
 
     try:
-        # Parse the URL
+        # Parse the URL and reconstruct it with the normalized path
         parsed = urlparse(url)
+        return urlunparse(parsed._replace(path=_normalize_path(parsed.path)))
 
-        # Clean multiple slashes in the path (but preserve the protocol://)
-        path = parsed.path
-
-        # Remember if the original path ended with a slash
-        ends_with_slash = path.endswith('/') and len(path) > 1
-
-        # Replace multiple consecutive slashes with single slash
-        path = re.sub(r'/+', '/', path)
-
-        # Split the path into segments
-        path_segments = path.split('/')
-
-        # Resolve '..' and '.' segments
-        normalized_segments = []
-        for segment in path_segments:
-            if segment == '..':
-                # Go up one level (remove last segment if exists)
-                if normalized_segments and normalized_segments[-1] != '':
-                    normalized_segments.pop()
-            elif segment == '.' or segment == '':
-                # Skip current directory references and empty segments
-                # (except for the first empty segment which represents root)
-                if not normalized_segments:
-                    normalized_segments.append('')
-            else:
-                normalized_segments.append(segment)
-
-        # Reconstruct the path
-        normalized_path = '/'.join(normalized_segments)
+    except Exception as e:
+        logger.warning("Failed to normalize URL %s: %s", url, e)
+        return url
 
-        # Ensure path starts with / if it's not empty
-        if normalized_path and not normalized_path.startswith('/'):
-            normalized_path = '/' + normalized_path
+@lru_cache(maxsize=65536)
+def _normalize_and_dedupe(url):
+    """
+    Normalize a URL's path and strip its fragment with a single parse
 
-        # Handle empty path case
-        if not normalized_path:
-            normalized_path = '/'
+    Args:
+        url (str): Absolute URL
 
-        # Restore trailing slash if it was present and we have content after root
-        if ends_with_slash and normalized_path != '/' and not normalized_path.endswith('/'):
-            normalized_path += '/'
+    Returns:
+        tuple: (normalized URL with fragment, normalized URL without fragment)
+    """
+    # Most links are plain absolute URLs that need no work at all
+    if _is_canonical_url(url):
+        return url, url
 
-        # Reconstruct the URL
-        normalized_parsed = parsed._replace(path=normalized_path)
-        return urlunparse(normalized_parsed)
+    try:
+        parsed = urlparse(url)
+        parsed = parsed._replace(path=_normalize_path(parsed.path))
+        return urlunparse(parsed), urlunparse(parsed._replace(fragment=''))
 
     except Exception as e:
-        print(f"Warning: Failed to normalize URL {url}: {e}")
-        return url
+        logger.warning("Failed to normalize URL %s: %s", url, e)
+        return url, normalize_url_for_deduplication(url)
 
 def normalize_url_for_deduplication(url):
     """
@@ -120,11 +225,33 @@ def normalize_url_for_deduplication(url):
     if not url:
         return url
 
-    # Parse the URL and remove the fragment
-    parsed = urlparse(url)
-    # Reconstruct without fragment
-    normalized_parsed = parsed._replace(fragment='')
-    return urlunparse(normalized_parsed)
+    # The fragment is everything after the first '#'
+    i = url.find('#')
+    return url if i < 0 else url[:i]
+
+_NETLOC_SLOW_PATH_RE = re.compile(r'[\t\r\n\[\]]')
+
+@lru_cache(maxsize=64)
+def _base_domain(base_url):
+    """Get the netloc of the site's base URL without a www. prefix"""
+    domain = urlparse(base_url).netloc
+    return domain[4:] if domain.startswith('www.') else domain
+
+def _fast_netloc(url):
+    """Get the netloc of a URL without a www. prefix, skipping urlparse for plain http(s) URLs"""
+    # urlparse strips tabs and newlines and validates bracketed IPv6 hosts
+    if url.startswith(_ABS_SCHEMES) and not _NETLOC_SLOW_PATH_RE.search(url):
+        start = url.find('://') + 3
+        # The netloc ends at the first path, query or fragment delimiter
+        end = len(url)
+        for delimiter in '/?#':
+            position = url.find(delimiter, start, end)
+            if position != -1:
+                end = position
+        domain = url[start:end]
+    else:
+        domain = urlparse(url).netloc
+    return domain[4:] if domain.startswith('www.') else domain
 
 def is_same_domain(url, base_url):
     """
@@ -138,19 +265,40 @@ def is_same_domain(url, base_url):
         bool: True if the URL is from the same domain, False otherwise
     """
     try:
-        url_domain = urlparse(url).netloc
-        base_domain = urlparse(base_url).netloc
-
         # Handle www. prefix
-        if url_domain.startswith('www.'):
-            url_domain = url_domain[4:]
-        if base_domain.startswith('www.'):
-            base_domain = base_domain[4:]
-
-        return url_domain == base_domain
+        return _fast_netloc(url) == _base_domain(base_url)
     except:
         return False
 
+def _compile_substrings(substrings):
+    """Compile non-empty substrings into one alternation regex, or None if there are none"""
+    substrings = [re.escape(substring) for substring in substrings if substring]
+    return re.compile('|'.join(substrings)) if substrings else None
+
+@lru_cache(maxsize=16)
+def _compile_skip_rules(skip_extensions, skip_substrings):
+    """Compile skip rules from tuples of extensions and of skip substrings"""
+    return (
+        tuple(ext.lower() for ext in skip_extensions if ext),
+        _compile_substrings(skip_substrings),
+    )
+
+def _get_skip_rules(config):
+    """
+    Get the compiled skip rules for a configuration, building them on first use
+
+    Args:
+        config (dict): Configuration dictionary
+
+    Returns:
+        tuple: (lowercased extensions tuple, regex matching any skip pattern or excluded domain, or None)
+    """
+    # Patterns and domains are both plain substring tests, so one scan covers both
+    return _compile_skip_rules(
+        tuple(config['skip_extensions']),
+        tuple(config['skip_patterns']) + tuple(config['exclude_domains']),
+    )
+
 def should_skip_url(url, config, base_url):
     """
     Check if a URL should be skipped based on configuration
@@ -167,23 +315,63 @@ def should_skip_url(url, config, base_url):
     if not is_same_domain(url, base_url):
         return True
     
+    skip_extensions, skip_substrings_re = _get_skip_rules(config)
+
     # Skip based on extensions
-    for ext in config['skip_extensions']:
-        if ext and url.lower().endswith(ext.lower()):
-            return True
-    
-    # Skip based on patterns
-    for pattern in config['skip_patterns']:
-        if pattern and pattern in url:
-            return True
+    if skip_extensions and url.lower().endswith(skip_extensions):
+        return True
     
-    # Skip based on domains
-    for domain in config['exclude_domains']:
-        if domain and domain in url:
-            return True
+    # Skip based on patterns and excluded domains
+    if skip_substrings_re and skip_substrings_re.search(url):
+        return True
     
     return False
 
+def _tag_name(tag):
+    """Get the lowercase name of an lxml element or BeautifulSoup tag"""
+    return tag.name if isinstance(tag, Tag) else tag.tag
+
+def _iter_link_tags(html):
+    """
+    Iterate over the link-carrying tags of a document in document order
+
+    Args:
+        html (str): HTML content
+
+    Returns:
+        iterator: lxml elements when lxml is installed, BeautifulSoup tags otherwise
+    """
+    root = parse_lxml_html(html)
+    if root is not None:
+        return iter_lxml_elements(root, 'a', 'area', 'frame', 'iframe')
+    if lxml_html is not None:
+        # lxml found nothing to parse
+        return iter(())
+    soup = BeautifulSoup(html, HTML_PARSER, parse_only=_LINK_TAGS)
+    return iter(soup.find_all(['a', 'area', 'frame', 'iframe']))
+
+def _link_text(tag, link_url):
+    """
+    Get the display text for a link tag
+
+    Args:
+        tag (lxml.html.HtmlElement or bs4.element.Tag): <a>, <area>, <frame> or <iframe> tag
+        link_url (str): Raw href/src of the tag, used when there is no better text
+
+    Returns:
+        str: Link text
+    """
+    name = _tag_name(tag)
+    if name == 'a':
+        text = tag.get_text() if isinstance(tag, Tag) else tag.text_content()
+        return text.strip() or link_url
+    if name == 'area':
+        return tag.get('alt', '') or tag.get('title', '') or link_url
+
+    # Get frame name or title for link text
+    frame_name = tag.get('name', '') or tag.get('title', '') or tag.get('id', '')
+    return f"Frame: {frame_name}" if frame_name else f"Frame: {link_url}"
+
 def extract_links_from_html(html, base_url, current_url, config):
     """
     Extract links from HTML - with improved fragment handling
@@ -195,110 +383,67 @@ def extract_links_from_html(html, base_url, current_url, config):
         config (dict): Configuration dictionary
 
     Returns:
-        list: List of link dictionaries
+        list: List of Link records
     """
-    soup = BeautifulSoup(html, 'html.parser')
     links = []
     
-    # Track URLs we've already processed to avoid duplicates with different fragments
+    # Track URLs we've already processed to avoid duplicates with different fragments.
+    # Only their hashes are kept: a 64-bit collision within one page is negligible.
     processed_urls = set()
 
-    # Extract links from <a> tags
-    for a_tag in soup.find_all('a', href=True):
-        link_url = a_tag['href']
-        link_text = a_tag.get_text().strip() or link_url
+    # Relative links all resolve against the same directory
+    current_dir = _page_dir(current_url)
 
-        # Normalize the URL (now includes path normalization)
-        normalized_url = normalize_url(link_url, base_url, current_url)
-        if not normalized_url:
-            continue
+    # Bind helpers used per link to local names
+    absolute_url_of = _absolute_url
+    normalize_and_dedupe = _normalize_and_dedupe
+    skip_url = should_skip_url
+    link_text = _link_text
+    seen_add = processed_urls.add
+    links_append = links.append
 
-        # Check if we should skip this URL
-        if should_skip_url(normalized_url, config, base_url):
-            continue
-            
-        # Remove fragment for deduplication
-        deduplicated_url = normalize_url_for_deduplication(normalized_url)
-        
-        # Skip if we've already processed this URL (ignoring fragment)
-        if deduplicated_url in processed_urls:
-            continue
-            
-        # Add to processed URLs set
-        processed_urls.add(deduplicated_url)
-
-        # Store both the original URL and the deduplicated URL
-        links.append({
-            'url': deduplicated_url,  # Use deduplicated URL (without fragment) for crawling
-            'original_url': normalized_url,  # Keep original URL with fragment for reference
-            'text': link_text
-        })
-
-    # Extract links from <area> tags (for image maps)
-    for area_tag in soup.find_all('area', href=True):
-        link_url = area_tag['href']
-        link_text = area_tag.get('alt', '') or area_tag.get('title', '') or link_url
-
-        # Normalize the URL (now includes path normalization)
-        normalized_url = normalize_url(link_url, base_url, current_url)
-        if not normalized_url:
-            continue
-
-        # Check if we should skip this URL
-        if should_skip_url(normalized_url, config, base_url):
-            continue
-            
-        # Remove fragment for deduplication
-        deduplicated_url = normalize_url_for_deduplication(normalized_url)
-        
-        # Skip if we've already processed this URL (ignoring fragment)
-        if deduplicated_url in processed_urls:
-            continue
-            
-        # Add to processed URLs set
-        processed_urls.add(deduplicated_url)
-
-        links.append({
-            'url': deduplicated_url,  # Use deduplicated URL (without fragment) for crawling
-            'original_url': normalized_url,  # Keep original URL with fragment for reference
-            'text': link_text
-        })
+    def _emit(tag, link_url):
+        absolute_url = absolute_url_of(link_url, base_url, current_url, current_dir)
+        if not absolute_url:
+            return
 
-    # Extract links from <frame> and <iframe> tags
-    for frame_tag in soup.find_all(['frame', 'iframe'], src=True):
-        frame_url = frame_tag['src']
-
-        # Skip javascript: and about:blank URLs
-        if frame_url.startswith('javascript:') or frame_url == 'about:blank':
-            continue
-
-        # Get frame name or title for link text
-        frame_name = frame_tag.get('name', '') or frame_tag.get('title', '') or frame_tag.get('id', '')
-        link_text = f"Frame: {frame_name}" if frame_name else f"Frame: {frame_url}"
-
-        # Normalize the URL (now includes path normalization)
-        normalized_url = normalize_url(frame_url, base_url, current_url)
+        # Normalize the path and remove the fragment for deduplication in one parse
+        normalized_url, deduplicated_url = normalize_and_dedupe(absolute_url)
         if not normalized_url:
-            continue
+            return
 
         # Check if we should skip this URL
-        if should_skip_url(normalized_url, config, base_url):
-            continue
-            
-        # Remove fragment for deduplication
-        deduplicated_url = normalize_url_for_deduplication(normalized_url)
-        
+        if skip_url(normalized_url, config, base_url):
+            return
+
         # Skip if we've already processed this URL (ignoring fragment)
-        if deduplicated_url in processed_urls:
-            continue
-            
+        url_key = hash(deduplicated_url)
+        if url_key in processed_urls:
+            return
+
         # Add to processed URLs set
-        processed_urls.add(deduplicated_url)
+        seen_add(url_key)
+
+        # Crawl the deduplicated URL (without fragment); keep the original for reference
+        links_append(Link(deduplicated_url, normalized_url, link_text(tag, link_url)))
+
+    # Walk the tree once; <a> links take precedence over image map <area>
+    # links, which take precedence over frames, when deduplicating
+    anchors, areas, frames = [], [], []
+    tag_name = _tag_name
+    for tag in _iter_link_tags(html):
+        name = tag_name(tag)
+        if name == 'a' or name == 'area':
+            href = tag.get('href')
+            if href is not None:
+                (anchors if name == 'a' else areas).append((tag, href))
+        else:
+            src = tag.get('src')
+            # Skip javascript: and about:blank URLs
+            if src is not None and not src.startswith('javascript:') and src != 'about:blank':
+                frames.append((tag, src))
 
-        links.append({
-            'url': deduplicated_url,  # Use deduplicated URL (without fragment) for crawling
-            'original_url': normalized_url,  # Keep original URL with fragment for reference
-            'text': link_text
-        })
+    for tag, link_url in anchors + areas + frames:
+        _emit(tag, link_url)
 
-    return links
\ No newline at end of file
+    return links
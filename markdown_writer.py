@@ -1,7 +1,70 @@
+import gzip
+import logging
+import mmap
 import os
+from itertools import islice
 from utils import get_formatted_datetime
 
-def write_main_page_analysis(output_path, main_html, base_url, encoding, frames, title=None, keywords=None, start_url=None):
+logger = logging.getLogger(__name__)
+
+# Output files are built in memory and written in one go; a 1 MB buffer
+# lets even large pages reach the disk with a single flush
+WRITE_BUFFER_SIZE = 1 << 20
+
+# Documents at least this large are written through a memory map instead
+MMAP_WRITE_THRESHOLD = 8 << 20
+
+# Raw HTML larger than this goes to a gzipped sibling file instead of the markdown
+RAW_HTML_GZIP_THRESHOLD = 64 * 1024
+
+def _write_document(output_path, parts):
+    """
+    Write the collected pieces of a markdown document to disk in one call
+
+    Args:
+        output_path (str): Path to the output file
+        parts (list): Strings making up the document, in order
+    """
+    # Encode once and write bytes, bypassing the text layer entirely
+    data = ''.join(parts).encode('utf-8')
+    if not data or len(data) < MMAP_WRITE_THRESHOLD:
+        with open(output_path, 'wb', buffering=WRITE_BUFFER_SIZE) as f:
+            f.write(data)
+        return
+
+    # Very large documents (summaries of big crawls) are copied straight
+    # into a mapping of the file instead of going through the write buffer
+    with open(output_path, 'w+b') as f:
+        f.truncate(len(data))
+        with mmap.mmap(f.fileno(), len(data)) as mm:
+            mm[:] = data
+
+def _raw_html_section(output_path, html, heading):
+    """
+    Build the raw HTML section of a markdown file
+
+    Small pages are embedded in a fenced block; larger ones are written to a
+    gzipped sibling file that the section links to.
+
+    Args:
+        output_path (str): Path to the markdown file
+        html (str): Raw HTML content
+        heading (str): Section heading
+
+    Returns:
+        str: Markdown for the raw HTML section
+    """
+    if len(html) <= RAW_HTML_GZIP_THRESHOLD:
+        return f"\n\n## {heading}\n\n```html\n{html}\n```\n"
+
+    gz_path = os.path.splitext(output_path)[0] + '.html.gz'
+    with gzip.open(gz_path, 'wb', compresslevel=1) as gz:
+        gz.write(html.encode('utf-8'))
+    gz_name = os.path.basename(gz_path)
+    return f"\n\n## {heading}\n\n[Raw HTML (gz)]({gz_name})\n"
+
+def write_main_page_analysis(output_path, main_html, base_url, encoding, frames, title=None, keywords=None, start_url=None,
+                             include_raw_html=False, crawl_timestamp=None):
     """
     Write the main page analysis to a markdown file
 
@@ -14,50 +77,58 @@ def write_main_page_analysis(output_path, main_html, base_url, encoding, frames,
         title (str, optional): Title of the main page
         keywords (str, optional): Keywords from the main page
         start_url (str, optional): Original start URL from configuration
+        include_raw_html (bool, optional): Whether to include the raw HTML
+        crawl_timestamp (str, optional): Crawl date to show; defaults to the current time
 
     Returns:
         str: Path to the created file
     """
-    with open(output_path, 'w', encoding='utf-8') as f:
-        f.write(f"# Orthodox.cn Main Page Analysis\n\n")
-        f.write(f"**Crawl Date:** {get_formatted_datetime()}\n")
-
-        # Show both start URL and base URL if start URL is provided
-        if start_url:
-            f.write(f"**Start URL:** {start_url}\n")
-            f.write(f"**Base URL:** {base_url}\n")
-        else:
-            f.write(f"**Base URL:** {base_url}\n")
-
-        f.write(f"**Encoding:** {encoding}\n\n")
-        
-        # Add title if available
-        if title:
-            f.write(f"**Title:** {title}\n\n")
-        
-        # Add keywords if available
-        if keywords:
-            f.write(f"**Keywords:** {keywords}\n\n")
-        
-        f.write(f"## Frame Structure\n\n")
-        f.write(f"Total frames found: **{len(frames)}**\n\n")
-        
-        if frames:
-            f.write(f"| Frame # | Name | Source | Attributes |\n")
-            f.write(f"|---------|------|--------|-----------|\n")
-            for i, frame in enumerate(frames):
-                src = frame.get('src', 'No source')
-                name = frame.get('name', f'unnamed_frame_{i}')
-                attrs = ', '.join([f"{k}={v}" for k, v in frame.attrs.items() if k not in ['src', 'name']])
-                f.write(f"| {i+1} | {name} | `{src}` | {attrs} |\n")
-        
-        # f.write(f"\n## Raw HTML Structure\n\n")
-        # f.write(f"```html\n{main_html}\n```\n")
+    parts = []
+    append = parts.append
+    append(f"# Orthodox.cn Main Page Analysis\n\n")
+    append(f"**Crawl Date:** {crawl_timestamp or get_formatted_datetime()}\n")
+
+    # Show both start URL and base URL if start URL is provided
+    if start_url:
+        append(f"**Start URL:** {start_url}\n")
+        append(f"**Base URL:** {base_url}\n")
+    else:
+        append(f"**Base URL:** {base_url}\n")
+
+    append(f"**Encoding:** {encoding}\n\n")
+    
+    # Add title if available
+    if title:
+        append(f"**Title:** {title}\n\n")
     
-    print(f"💾 Saved main page analysis to: {output_path}")
+    # Add keywords if available
+    if keywords:
+        append(f"**Keywords:** {keywords}\n\n")
+    
+    append(f"## Frame Structure\n\n")
+    append(f"Total frames found: **{len(frames)}**\n\n")
+    
+    if frames:
+        append(f"| Frame # | Name | Source | Attributes |\n")
+        append(f"|---------|------|--------|-----------|\n")
+        for i, frame in enumerate(frames):
+            # src and name have their own columns; the rest are listed together
+            frame_attrs = dict(frame.attrs)
+            src = frame_attrs.pop('src', 'No source')
+            name = frame_attrs.pop('name', f'unnamed_frame_{i}')
+            attrs = ', '.join([f"{k}={v}" for k, v in frame_attrs.items()])
+            append(f"| {i+1} | {name} | `{src}` | {attrs} |\n")
+    
+    if include_raw_html:
+        append(_raw_html_section(output_path, main_html, "Raw HTML Structure"))
+
+    _write_document(output_path, parts)
+    
+    logger.info("💾 Saved main page analysis to: %s", output_path)
     return output_path
 
-def write_frame_content(output_path, frame_number, frame_name, frame_url, content, html, title=None, links=None):
+def write_frame_content(output_path, frame_number, frame_name, frame_url, content, html, title=None, links=None,
+                        include_raw_html=False, crawl_timestamp=None):
     """
     Write frame content to a markdown file
     
@@ -70,37 +141,42 @@ def write_frame_content(output_path, frame_number, frame_name, frame_url, conten
         html (str): Raw HTML content
         title (str, optional): Title of the frame
         links (list, optional): List of links found in the frame
+        include_raw_html (bool, optional): Whether to include the raw HTML
+        crawl_timestamp (str, optional): Crawl date to show; defaults to the current time
         
     Returns:
         str: Path to the created file
     """
-    with open(output_path, 'w', encoding='utf-8') as f:
-        f.write(f"# Frame {frame_number}: {frame_name}\n\n")
-        f.write(f"**Crawl Date:** {get_formatted_datetime()}\n")
-        f.write(f"**Frame URL:** {frame_url}\n")
-        f.write(f"**Frame Name:** {frame_name}\n")
-        f.write(f"**Content Length:** {len(content)} characters\n")
-        
-        if title:
-            f.write(f"**Page Title:** {title}\n")
-        
-        f.write(f"\n## Content\n\n")
-        f.write(content)
-        
-        # Add links section
-        if links:
-            f.write(f"\n\n## Links Found ({len(links)})\n\n")
-            for link in links:
-                f.write(f"- [{link['text']}]({link['url']})\n")
-        
-        # Add raw HTML section
-        # f.write(f"\n\n## Raw HTML\n\n")
-        # f.write(f"```html\n{html}\n```\n")
+    parts = []
+    append = parts.append
+    append(f"# Frame {frame_number}: {frame_name}\n\n")
+    append(f"**Crawl Date:** {crawl_timestamp or get_formatted_datetime()}\n")
+    append(f"**Frame URL:** {frame_url}\n")
+    append(f"**Frame Name:** {frame_name}\n")
+    append(f"**Content Length:** {len(content)} characters\n")
+    
+    if title:
+        append(f"**Page Title:** {title}\n")
+    
+    append(f"\n## Content\n\n")
+    append(content)
+    
+    # Add links section
+    if links:
+        append(f"\n\n## Links Found ({len(links)})\n\n")
+        parts.extend(f"- [{link.text}]({link.url})\n" for link in links)
     
-    print(f"💾 Saved frame {frame_number} to: {output_path}")
+    # Add raw HTML section
+    if include_raw_html:
+        append(_raw_html_section(output_path, html, "Raw HTML"))
+
+    _write_document(output_path, parts)
+    
+    logger.info("💾 Saved frame %s to: %s", frame_number, output_path)
     return output_path
 
-def write_page_content(output_path, title, url, content, html, parent_info, link_text, depth, links=None, additional_info=None):
+def write_page_content(output_path, title, url, content, html, parent_info, link_text, depth, links=None, additional_info=None,
+                       include_raw_html=False, crawl_timestamp=None):
     """
     Write page content to a markdown file
     
@@ -115,41 +191,46 @@ def write_page_content(output_path, title, url, content, html, parent_info, link
         depth (int): Depth level of the page
         links (list, optional): List of links found in the page
         additional_info (str, optional): Additional information to include
+        include_raw_html (bool, optional): Whether to include the raw HTML
+        crawl_timestamp (str, optional): Crawl date to show; defaults to the current time
         
     Returns:
         str: Path to the created file
     """
-    with open(output_path, 'w', encoding='utf-8') as f:
-        f.write(f"# {title}\n\n")
-        f.write(f"**Crawl Date:** {get_formatted_datetime()}\n")
-        f.write(f"**URL:** {url}\n")
-        f.write(f"**Depth:** {depth}\n")
-        f.write(f"**Parent:** {parent_info['name']} ({parent_info['type']})\n")
-        f.write(f"**Parent URL:** {parent_info['url']}\n")
-        f.write(f"**Link Text:** {link_text}\n")
-        f.write(f"**Content Length:** {len(content)} characters\n")
-        
-        # Add additional info if provided
-        if additional_info:
-            f.write(additional_info)
-        
-        f.write(f"\n## Content\n\n")
-        f.write(content)
-        
-        # Add links section
-        if links:
-            f.write(f"\n\n## Links Found ({len(links)})\n\n")
-            for link in links[:20]:  # Limit to 20 links in the output
-                f.write(f"- [{link['text']}]({link['url']})\n")
-        
-        # Add raw HTML section
-        # f.write(f"\n\n## Raw HTML\n\n")
-        # f.write(f"```html\n{html}\n```\n")
+    parts = []
+    append = parts.append
+    append(f"# {title}\n\n")
+    append(f"**Crawl Date:** {crawl_timestamp or get_formatted_datetime()}\n")
+    append(f"**URL:** {url}\n")
+    append(f"**Depth:** {depth}\n")
+    append(f"**Parent:** {parent_info['name']} ({parent_info['type']})\n")
+    append(f"**Parent URL:** {parent_info['url']}\n")
+    append(f"**Link Text:** {link_text}\n")
+    append(f"**Content Length:** {len(content)} characters\n")
     
-    print(f"💾 Saved depth={depth} page to: {output_path}")
+    # Add additional info if provided
+    if additional_info:
+        append(additional_info)
+    
+    append(f"\n## Content\n\n")
+    append(content)
+    
+    # Add links section
+    if links:
+        append(f"\n\n## Links Found ({len(links)})\n\n")
+        # Limit to 20 links in the output
+        parts.extend(f"- [{link.text}]({link.url})\n" for link in islice(links, 20))
+    
+    # Add raw HTML section
+    if include_raw_html:
+        append(_raw_html_section(output_path, html, "Raw HTML"))
+
+    _write_document(output_path, parts)
+    
+    logger.info("💾 Saved depth=%s page to: %s", depth, output_path)
     return output_path
 
-def write_summary(output_path, base_url, max_depth, all_pages, main_analysis_path, start_url=None):
+def write_summary(output_path, base_url, max_depth, all_pages, main_analysis_path, start_url=None, crawl_timestamp=None):
     """
     Write a summary of the crawl to a markdown file
 
@@ -160,115 +241,127 @@ def write_summary(output_path, base_url, max_depth, all_pages, main_analysis_pat
         all_pages (list): List of all page information dictionaries
         main_analysis_path (str): Path to the main page analysis file
         start_url (str, optional): Original start URL from configuration
+        crawl_timestamp (str, optional): Crawl date to show; defaults to the current time
 
     Returns:
         str: Path to the created file
     """
-    # Group pages by depth
+    basename = os.path.basename
+
+    # Group pages by depth, index them by parent and look up their file
+    # names (keyed by object identity) in a single pass
     pages_by_depth = {}
+    children_by_parent = {}
+    file_names = {}
     for page in all_pages:
-        depth = page['depth']
-        if depth not in pages_by_depth:
-            pages_by_depth[depth] = []
-        pages_by_depth[depth].append(page)
-
-    with open(output_path, 'w', encoding='utf-8') as f:
-        f.write(f"# Orthodox.cn Crawl Results\n\n")
-        f.write(f"**Crawl Date:** {get_formatted_datetime()}\n")
-
-        # Show both start URL and base URL if start URL is provided
-        if start_url:
-            f.write(f"**Start URL:** {start_url}\n")
-            f.write(f"**Base URL:** {base_url}\n")
-        else:
-            f.write(f"**Base URL:** {base_url}\n")
-
-        f.write(f"**Max Depth:** {max_depth}\n")
-        f.write(f"**Total Pages Crawled:** {len(all_pages)}\n\n")
-
-        # Count pages by depth
-        f.write(f"## Pages by Depth\n\n")
-        f.write(f"| Depth | Count |\n")
-        f.write(f"|-------|-------|\n")
-        for depth in sorted(pages_by_depth.keys()):
-            f.write(f"| {depth} | {len(pages_by_depth[depth])} |\n")
-
-        f.write(f"\n## Files Generated\n\n")
-        f.write(f"1. **Main Page Analysis:** `{os.path.basename(main_analysis_path)}`\n")
-
-        # List all pages by depth
-        file_counter = 2
-        for depth in sorted(pages_by_depth.keys()):
-            f.write(f"\n### Depth {depth} Files\n\n")
-            for page in pages_by_depth[depth]:
-                page_type = page['type']
-                page_name = page['name'] if 'name' in page else page['title']
-                has_frames = " (has frames)" if page.get('has_frames', False) else ""
-
-                f.write(f"{file_counter}. **{page_type.capitalize()} {page['number']} ({page_name}):{has_frames}** `{os.path.basename(page['file_path'])}`\n")
-                file_counter += 1
-
-        f.write(f"\n## Site Structure\n\n")
-        f.write(f"**Website:** 中国正教会 (Chinese Orthodox Church)\n\n")
-
-        # Create a page tree
-        f.write(f"### Page Hierarchy\n\n")
-
-        # Start with depth 0 pages (frames)
-        if 0 in pages_by_depth:
-            for page in pages_by_depth[0]:
-                f.write(f"- **{page['title']}** ({page['url']})\n")
-
-                # Find children of this page
-                children = [p for p in all_pages if p.get('parent_id') == page['id']]
-                if children:
-                    for child in children:
-                        f.write(f"  - [{child['title']}]({os.path.basename(child['file_path'])}) (depth={child['depth']})\n")
-
-                        # Find grandchildren (limit to 3 levels for readability)
-                        grandchildren = [p for p in all_pages if p.get('parent_id') == child['id']]
-                        if grandchildren:
-                            for gc in grandchildren[:5]:  # Limit to 5 grandchildren
-                                f.write(f"    - [{gc['title']}]({os.path.basename(gc['file_path'])}) (depth={gc['depth']})\n")
-
-                            if len(grandchildren) > 5:
-                                f.write(f"    - ... and {len(grandchildren) - 5} more\n")
-
-        # Detailed page information by depth
-        for depth in sorted(pages_by_depth.keys()):
-            f.write(f"\n### Depth {depth} Pages\n\n")
-
-            for page in pages_by_depth[depth]:
-                page_type = page['type']
-                page_title = page['title']
-                frames_info = " (contains frames)" if page.get('has_frames', False) else ""
-
-                f.write(f"#### {page_type.capitalize()} {page['number']}: {page_title}{frames_info}\n")
-                f.write(f"- **URL:** {page['url']}\n")
-                f.write(f"- **Content Length:** {len(page['content'])} characters\n")
-
-                if 'parent_name' in page and page['parent_name']:
-                    f.write(f"- **Parent:** {page['parent_name']} ({page.get('parent_url', 'No URL')})\n")
-
-                f.write(f"- **File:** [{os.path.basename(page['file_path'])}]({os.path.basename(page['file_path'])})\n")
-
-                # Add frame information if present
-                if page.get('has_frames', False) and page.get('frames'):
-                    f.write(f"- **Frames ({len(page['frames'])}):**\n")
-                    for frame in page['frames']:
-                        f.write(f"  - Frame {frame['number']}: {frame['name']} ({frame['url']})\n")
-
-                # List links that were crawled from this page
-                children = [p for p in all_pages if p.get('parent_id') == page.get('id')]
-                if children:
-                    f.write(f"- **Links Crawled ({len(children)}):**\n")
-                    for child in children[:10]:  # Limit to 10 links
-                        f.write(f"  - [{child['title']}]({os.path.basename(child['file_path'])})\n")
-
-                    if len(children) > 10:
-                        f.write(f"  - ... and {len(children) - 10} more\n")
-
-                f.write("\n")
-
-    print(f"📋 Created summary file: {output_path}")
+        pages_by_depth.setdefault(page['depth'], []).append(page)
+        children_by_parent.setdefault(page.get('parent_id'), []).append(page)
+        file_names[id(page)] = basename(page['file_path'])
+
+    depths = sorted(pages_by_depth)
+
+    parts = []
+    append = parts.append
+    extend = parts.extend
+    append(f"# Orthodox.cn Crawl Results\n\n")
+    append(f"**Crawl Date:** {crawl_timestamp or get_formatted_datetime()}\n")
+
+    # Show both start URL and base URL if start URL is provided
+    if start_url:
+        append(f"**Start URL:** {start_url}\n")
+        append(f"**Base URL:** {base_url}\n")
+    else:
+        append(f"**Base URL:** {base_url}\n")
+
+    append(f"**Max Depth:** {max_depth}\n")
+    append(f"**Total Pages Crawled:** {len(all_pages)}\n\n")
+
+    # Count pages by depth
+    append("## Pages by Depth\n\n"
+           "| Depth | Count |\n"
+           "|-------|-------|\n")
+    extend(f"| {depth} | {len(pages_by_depth[depth])} |\n" for depth in depths)
+
+    append(f"\n## Files Generated\n\n"
+           f"1. **Main Page Analysis:** `{basename(main_analysis_path)}`\n")
+
+    # List all pages by depth
+    file_counter = 2
+    for depth in depths:
+        append(f"\n### Depth {depth} Files\n\n")
+        for page in pages_by_depth[depth]:
+            page_type = page['type']
+            page_name = page['name'] if 'name' in page else page['title']
+            has_frames = " (has frames)" if page.get('has_frames', False) else ""
+
+            append(f"{file_counter}. **{page_type.capitalize()} {page['number']} ({page_name}):{has_frames}** `{file_names[id(page)]}`\n")
+            file_counter += 1
+
+    append("\n## Site Structure\n\n"
+           "**Website:** 中国正教会 (Chinese Orthodox Church)\n\n")
+
+    # Create a page tree
+    append("### Page Hierarchy\n\n")
+
+    # Start with depth 0 pages (frames)
+    if 0 in pages_by_depth:
+        for page in pages_by_depth[0]:
+            append(f"- **{page['title']}** ({page['url']})\n")
+
+            # Find children of this page
+            children = children_by_parent.get(page['id'], [])
+            if children:
+                for child in children:
+                    append(f"  - [{child['title']}]({file_names[id(child)]}) (depth={child['depth']})\n")
+
+                    # Find grandchildren (limit to 3 levels for readability)
+                    grandchildren = children_by_parent.get(child['id'], [])
+                    if grandchildren:
+                        extend(f"    - [{gc['title']}]({file_names[id(gc)]}) (depth={gc['depth']})\n"
+                               for gc in islice(grandchildren, 5))  # Limit to 5 grandchildren
+
+                        if len(grandchildren) > 5:
+                            append(f"    - ... and {len(grandchildren) - 5} more\n")
+
+    # Detailed page information by depth
+    for depth in depths:
+        append(f"\n### Depth {depth} Pages\n\n")
+
+        for page in pages_by_depth[depth]:
+            page_type = page['type']
+            page_title = page['title']
+            frames_info = " (contains frames)" if page.get('has_frames', False) else ""
+
+            file_name = file_names[id(page)]
+
+            append(f"#### {page_type.capitalize()} {page['number']}: {page_title}{frames_info}\n"
+                   f"- **URL:** {page['url']}\n"
+                   f"- **Content Length:** {len(page['content'])} characters\n")
+
+            if 'parent_name' in page and page['parent_name']:
+                append(f"- **Parent:** {page['parent_name']} ({page.get('parent_url', 'No URL')})\n")
+
+            append(f"- **File:** [{file_name}]({file_name})\n")
+
+            # Add frame information if present
+            if page.get('has_frames', False) and page.get('frames'):
+                append(f"- **Frames ({len(page['frames'])}):**\n")
+                extend(f"  - Frame {frame.number}: {frame.name} ({frame.url})\n"
+                       for frame in page['frames'])
+
+            # List links that were crawled from this page
+            children = children_by_parent.get(page.get('id'), [])
+            if children:
+                append(f"- **Links Crawled ({len(children)}):**\n")
+                extend(f"  - [{child['title']}]({file_names[id(child)]})\n"
+                       for child in islice(children, 10))  # Limit to 10 links
+
+                if len(children) > 10:
+                    append(f"  - ... and {len(children) - 10} more\n")
+
+            append("\n")
+
+    _write_document(output_path, parts)
+
+    logger.info("📋 Created summary file: %s", output_path)
     return output_path
\ No newline at end of file
@@ -2,13 +2,123 @@ import asyncio
 import aiohttp
 import ssl
 import chardet
-import os
+import codecs
+import html
+import logging
+import posixpath
 import re
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
 from urllib.parse import urlparse, urljoin
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
 from crawl4ai import AsyncWebCrawler, BrowserConfig, CrawlerRunConfig
 from link_extractor import is_same_domain
 from language_detector import is_target_language, detect_chinese_content_patterns
+from utils import HTML_PARSER
+
+# Optional: compiled charset detectors are much faster than pure-Python
+# chardet. cchardet is preferred, then charset-normalizer; chardet is the
+# fallback when neither is installed.
+try:
+    import cchardet
+except ImportError:
+    cchardet = None
+
+try:
+    import charset_normalizer
+except ImportError:
+    charset_normalizer = None
+
+logger = logging.getLogger(__name__)
+
+# Charset declarations (<meta charset> / http-equiv Content-Type) near the top of a page
+_META_CHARSET_RE = re.compile(rb'charset\s*=\s*["\']?([\w.:-]+)', re.IGNORECASE)
+META_SNIFF_BYTES = 4096
+
+# Byte order marks and the encodings they imply, longest first
+_BOMS = (
+    (codecs.BOM_UTF32_LE, 'utf-32'),
+    (codecs.BOM_UTF32_BE, 'utf-32'),
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+)
+
+# Canonical codec names (as returned by _codec_name) of the Russian and
+# Chinese encodings; detectors and servers report them under various
+# aliases, e.g. 'koi8_r', 'windows-1251' or 'GB2312'
+_RUSSIAN_CODECS = frozenset({'koi8-r', 'cp1251'})
+_CHINESE_CODECS = frozenset({'gb2312', 'gbk', 'gb18030', 'big5', 'big5hkscs', 'cp950', 'hz'})
+
+# Encodings tried when the detected one fails. gb18030 is a superset of
+# gbk and gb2312, so it goes first and gb2312 is not tried separately
+# (gbk stays for the few bytes gb18030 rejects); cp1251 is an alias of
+# windows-1251
+_CHINESE_FALLBACK_ENCODINGS = ('gb18030', 'gbk', 'big5', 'hz-gb-2312', 'utf-8', 'latin-1')
+_RUSSIAN_FALLBACK_ENCODINGS = ('windows-1251', 'koi8-r', 'utf-8', 'latin-1')
+_DEFAULT_FALLBACK_ENCODINGS = ('utf-8', 'windows-1251', 'koi8-r', 'gb18030', 'gbk', 'latin-1')
+
+# Encoding detection looks at most at this much of a page, fed to chardet in pieces
+DETECT_SAMPLE_BYTES = 64 * 1024
+DETECT_FEED_BYTES = 4096
+
+# Size of the chunks response bodies are read in, and the most that is
+# allocated up front for an announced Content-Length; a larger body grows
+# the buffer as it arrives, so a bogus header cannot reserve arbitrary memory
+READ_CHUNK_SIZE = 64 * 1024
+READ_PREALLOC_MAX = 8 << 20
+
+# Encodings detected for pages without a declaration, by directory (as
+# returned by get_base_url); the pages of one section of a site are almost
+# always in the same encoding. Only multi-byte codecs are remembered: they
+# reject most text in another encoding, while single-byte ones such as
+# cp1251 or koi8-r decode any bytes, so a wrong cached one would go unnoticed
+_PREFIX_ENCODINGS = OrderedDict()
+PREFIX_ENCODINGS_SIZE = 1024
+_CACHEABLE_CODECS = _CHINESE_CODECS - {'hz'}
+
+# Frame tags and the page title, found without parsing the page; a <frame
+# in a comment or script only costs a parse that then finds no frames
+_FRAME_TAG_RE = re.compile(r'<i?frame[\s/>]', re.IGNORECASE)
+_TITLE_RE = re.compile(r'<title[^>]*>(.*?)</title\s*>', re.IGNORECASE | re.DOTALL)
+
+# Parser for pages whose main content is extracted: lxml keeps the content of
+# <noframes> as raw text, so a frameset page's fallback <body> would be lost
+_MAIN_CONTENT_PARSER = 'html.parser'
+
+# Tags of the main page that are used: the frames, plus the title and meta
+# tags read from the same parse
+_FRAME_PAGE_TAGS = SoupStrainer(['title', 'meta', 'frame', 'iframe'])
+
+# Frame sources that don't point to a crawlable page
+_BAD_SCHEME_RE = re.compile(r'\s*(?:(?:javascript|data|mailto|about):|#)', re.IGNORECASE)
+
+# Maximum number of frames of one page crawled at the same time
+DEFAULT_FRAME_CONCURRENCY = 8
+
+# Connection pool of the shared session: a crawl mostly hits one host, so
+# connections and DNS lookups are kept around between requests
+CONNECTIONS_PER_HOST = 20
+DNS_CACHE_TTL = 300
+KEEPALIVE_TIMEOUT = 30
+
+# Any of these tags marks decoded content as HTML; matched in one case-insensitive pass
+_HTML_STRUCTURE_RE = re.compile(r'<(?:html|head|body|div|p|title)', re.IGNORECASE | re.ASCII)
+
+# Patterns that suggest Chinese content decoded with a Russian encoding
+_CORRUPTION_PATTERNS = (
+    re.compile(r'[А-Я]{10,}'),  # Long sequences of uppercase Cyrillic (unusual in normal text)
+    re.compile(r'[а-я]{1}[А-Я]{1}[а-я]{1}[А-Я]{1}'),  # Alternating case (corruption indicator)
+    re.compile(r'[Ё-я]{20,}'),  # Very long sequences of Cyrillic characters
+)
+
+# Control bytes other than tab, newline and carriage return
+_CONTROL_BYTES = bytes(range(32)).translate(None, b'\t\n\r')
+
+# Characters of decoded content checked for control characters; the share
+# of them in the first 100K characters is representative of the whole page
+CONTROL_CHAR_SAMPLE_CHARS = 100_000
 
 def _validate_decoded_content(html_content, used_encoding, original_encoding):
     """
@@ -27,41 +137,39 @@ def _validate_decoded_content(html_content, used_encoding, original_encoding):
         return False
 
     # Check for reasonable HTML structure
-    if not any(tag in html_content.lower() for tag in ['<html', '<head', '<body', '<div', '<p', '<title']):
+    if not _HTML_STRUCTURE_RE.search(html_content):
         return False
 
     # Check if this appears to be Chinese content based on HTML patterns
     if detect_chinese_content_patterns(html_content):
         # If HTML suggests Chinese content but we're using Russian encoding, it's likely corrupted
-        if used_encoding.lower() in ['koi8-r', 'windows-1251', 'cp1251']:
-            print(f"⚠️ HTML patterns suggest Chinese content but decoded with {used_encoding} - likely corrupted")
+        if _codec_name(used_encoding) in _RUSSIAN_CODECS:
+            logger.warning("⚠️ HTML patterns suggest Chinese content but decoded with %s - likely corrupted", used_encoding)
             return False
 
     # Check for encoding mismatch indicators
     # If original was Chinese but we're using Russian encoding, look for corruption signs
-    if (original_encoding and original_encoding.lower().startswith(('gb', 'big5')) and
-        used_encoding.lower() in ['koi8-r', 'windows-1251', 'cp1251']):
+    if (_codec_name(original_encoding) in _CHINESE_CODECS and
+        _codec_name(used_encoding) in _RUSSIAN_CODECS):
 
         # Look for patterns that suggest Chinese content decoded with wrong encoding
         # Chinese characters decoded with Russian encodings often produce specific patterns
-        corruption_patterns = [
-            r'[А-Я]{10,}',  # Long sequences of uppercase Cyrillic (unusual in normal text)
-            r'[а-я]{1}[А-Я]{1}[а-я]{1}[А-Я]{1}',  # Alternating case (corruption indicator)
-            r'[Ё-я]{20,}',  # Very long sequences of Cyrillic characters
-        ]
-
-        for pattern in corruption_patterns:
-            if re.search(pattern, html_content):
-                print(f"⚠️ Detected corruption pattern when Chinese content decoded with {used_encoding}")
+        for pattern in _CORRUPTION_PATTERNS:
+            if pattern.search(html_content):
+                logger.warning("⚠️ Detected corruption pattern when Chinese content decoded with %s", used_encoding)
                 return False
 
     # Check character distribution - normal text shouldn't have too many control characters
-    control_chars = sum(1 for c in html_content if ord(c) < 32 and c not in '\n\r\t')
-    if control_chars > len(html_content) * 0.01:  # More than 1% control characters is suspicious
+    # (control characters are single bytes in UTF-8, so they can be counted on the encoded text)
+    sample = html_content[:CONTROL_CHAR_SAMPLE_CHARS]
+    encoded = sample.encode('utf-8', 'replace')
+    control_chars = len(encoded) - len(encoded.translate(None, _CONTROL_BYTES))
+    if control_chars > len(sample) * 0.01:  # More than 1% control characters is suspicious
         return False
 
     return True
 
+@lru_cache(maxsize=1024)
 def get_base_url(url):
     """
     Extract the base URL (domain with path up to the last /) from a URL
@@ -79,8 +187,8 @@ def get_base_url(url):
     # If the URL ends with a filename (has a dot in the last part), 
     # remove the filename to get the directory
     path = parsed.path
-    if '.' in os.path.basename(path):
-        path = os.path.dirname(path)
+    if '.' in posixpath.basename(path):
+        path = posixpath.dirname(path)
     
     # Ensure path ends with a slash
     if path and not path.endswith('/'):
@@ -88,13 +196,223 @@ def get_base_url(url):
         
     return domain + path
 
-async def fetch_page_with_encoding_detection(url, session):
+@dataclass(slots=True)
+class PageResult:
+    """A page rendered by the browser crawler"""
+    url: str
+    html: str
+    cleaned_html: str
+    title: str
+
+@dataclass(slots=True)
+class FrameResult:
+    """A frame of a page, rendered by the browser crawler"""
+    number: int
+    name: str
+    url: str
+    content: str  # Cleaned HTML of the frame
+    html: str
+    title: str
+
+@lru_cache(maxsize=1)
+def _get_ssl_context():
+    """
+    Get the SSL context used for crawling, built on first use
+
+    Certificate checks are disabled for crawling, so the context is created
+    directly instead of with ssl.create_default_context(), which would load
+    and parse the system CA bundle only to not use it.
+
+    Returns:
+        ssl.SSLContext: Client context that accepts any certificate
+    """
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_CLIENT)
+    context.check_hostname = False
+    context.verify_mode = ssl.CERT_NONE
+    return context
+
+class FetcherContext:
+    """HTTP session and browser crawler shared by all fetches of a crawl run"""
+
+    def __init__(self, config):
+        self.config = config
+        self.session = None
+        self.crawler = None
+        self._crawler_cm = None
+
+    async def __aenter__(self):
+        headers = {
+            'User-Agent': self.config['user_agent']
+        }
+
+        self.session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(
+                limit=100,
+                limit_per_host=CONNECTIONS_PER_HOST,
+                ttl_dns_cache=DNS_CACHE_TTL,
+                keepalive_timeout=KEEPALIVE_TIMEOUT,
+                ssl=_get_ssl_context()
+            ),
+            timeout=aiohttp.ClientTimeout(total=20),
+            headers=headers
+        )
+        return self
+
+    async def get_crawler(self):
+        """Start the browser crawler on first use and return it"""
+        if self.crawler is None:
+            self._crawler_cm = await create_crawler(self.config)
+            self.crawler = await self._crawler_cm.__aenter__()
+        return self.crawler
+
+    async def __aexit__(self, exc_type, exc, tb):
+        try:
+            if self._crawler_cm is not None:
+                await self._crawler_cm.__aexit__(exc_type, exc, tb)
+        finally:
+            self._crawler_cm = self.crawler = None
+            await self.session.close()
+
+@lru_cache(maxsize=64)
+def _codec_name(encoding):
+    """
+    Get the canonical codec name for an encoding, so aliases compare equal
+
+    Args:
+        encoding (str): Encoding name, e.g. 'GB2312' or 'cp1251'
+
+    Returns:
+        str or None: Canonical codec name, or the lowercased name if Python doesn't know it
+    """
+    if not encoding:
+        return None
+    try:
+        return codecs.lookup(encoding).name
+    except LookupError:
+        return encoding.lower()
+
+def _detect_encoding(raw_content):
+    """
+    Detect the encoding of raw content with the fastest available detector
+
+    Args:
+        raw_content (bytes): Raw page content
+
+    Returns:
+        dict: Detection result with 'encoding' and 'confidence' keys, as returned by chardet
+    """
+    # The encoding shows in the first few KB just as well as in the whole page.
+    # End the sample after a '>' so it doesn't split a multi-byte character
+    # ('>' is never part of one in the legacy CJK encodings)
+    sample = bytes(raw_content[:DETECT_SAMPLE_BYTES])
+    if len(raw_content) > DETECT_SAMPLE_BYTES:
+        cut = sample.rfind(b'>')
+        if cut > 0:
+            sample = sample[:cut + 1]
+
+    if cchardet is not None:
+        detected = cchardet.detect(sample)
+        return {'encoding': detected['encoding'], 'confidence': detected['confidence'] or 0.0}
+
+    if charset_normalizer is not None:
+        best = charset_normalizer.from_bytes(sample).best()
+        if best is None:
+            return {'encoding': None, 'confidence': 0.0}
+        return {'encoding': best.encoding, 'confidence': 1.0 - best.chaos}
+
+    # chardet can stop as soon as it is sure, so feed the sample in pieces
+    detector = chardet.UniversalDetector()
+    for start in range(0, len(sample), DETECT_FEED_BYTES):
+        detector.feed(sample[start:start + DETECT_FEED_BYTES])
+        if detector.done:
+            break
+    return detector.close()
+
+def _remember_prefix_encoding(prefix, encoding):
+    """
+    Remember the encoding that worked for an undeclared page of a directory
+
+    Single-byte encodings are not remembered, see _PREFIX_ENCODINGS.
+
+    Args:
+        prefix (str): Base URL of the page, as returned by get_base_url
+        encoding (str): Encoding the page was decoded with
+    """
+    if _codec_name(encoding) not in _CACHEABLE_CODECS:
+        return
+    _PREFIX_ENCODINGS[prefix] = encoding
+    _PREFIX_ENCODINGS.move_to_end(prefix)
+    if len(_PREFIX_ENCODINGS) > PREFIX_ENCODINGS_SIZE:
+        _PREFIX_ENCODINGS.popitem(last=False)
+
+async def _read_body(response):
+    """
+    Read a response body into a single buffer, sized up front (up to
+    READ_PREALLOC_MAX) when the length is known
+
+    The body is kept as bytes rather than decoded while streaming: a wrong
+    declared or detected encoding is only noticed partway through, and the
+    fallback encodings then need the raw bytes again.
+
+    Args:
+        response (aiohttp.ClientResponse): Response to read
+
+    Returns:
+        bytearray: Response body
+    """
+    expected = min(response.content_length or 0, READ_PREALLOC_MAX)
+    body = bytearray(expected)
+    pos = 0
+    async for chunk in response.content.iter_chunked(READ_CHUNK_SIZE):
+        # Slice assignment past the end grows the buffer, which covers
+        # bodies that turn out longer than announced (e.g. decompressed)
+        body[pos:pos + len(chunk)] = chunk
+        pos += len(chunk)
+    del body[pos:]
+    return body
+
+def _declared_encoding(response, raw_content, trust_http_charset=True):
+    """
+    Find the encoding a page declares, without statistical detection
+
+    Checks the byte order mark, then the HTTP Content-Type charset, then a
+    charset declaration in the first few KB of the page.
+
+    Args:
+        response (aiohttp.ClientResponse): Response the content came from
+        raw_content (bytes): Raw page content
+        trust_http_charset (bool): Whether to use the Content-Type charset
+
+    Returns:
+        str or None: Declared encoding, or None if there is no usable declaration
+    """
+    for bom, bom_encoding in _BOMS:
+        if raw_content.startswith(bom):
+            return bom_encoding
+
+    candidates = [response.charset] if trust_http_charset else []
+    match = _META_CHARSET_RE.search(raw_content, 0, META_SNIFF_BYTES)
+    if match:
+        candidates.append(match.group(1).decode('ascii', 'ignore'))
+
+    for candidate in candidates:
+        if candidate:
+            try:
+                codecs.lookup(candidate)
+            except LookupError:
+                continue
+            return candidate
+    return None
+
+async def fetch_page_with_encoding_detection(url, session, trust_http_charset=True):
     """
     Fetch a page with encoding detection
     
     Args:
         url (str): URL to fetch
         session (aiohttp.ClientSession): Session to use for fetching
+        trust_http_charset (bool): Whether a charset in the Content-Type header
+            is used as is, or ignored for servers known to send a wrong one
         
     Returns:
         tuple: (html_content, encoding) or (None, None) if failed
@@ -103,112 +421,138 @@ async def fetch_page_with_encoding_detection(url, session):
         async with session.get(url) as response:
             if response.status == 200:
                 # Get raw bytes first
-                raw_content = await response.read()
-                
-                # Detect encoding
-                detected = chardet.detect(raw_content)
-                encoding = detected['encoding']
-                confidence = detected['confidence']
+                raw_content = await _read_body(response)
                 
-                print(f"📊 Detected encoding: {encoding} (confidence: {confidence:.2f})")
+                # Use the declared encoding if there is one; otherwise detect it
+                encoding = _declared_encoding(response, raw_content, trust_http_charset)
+                prefix = None
+                if encoding:
+                    logger.info("📊 Declared encoding: %s", encoding)
+                else:
+                    # Undeclared pages that are valid UTF-8 (including plain ASCII)
+                    # need no statistical detection
+                    try:
+                        html_content = raw_content.decode('utf-8')
+                    except UnicodeDecodeError:
+                        pass
+                    else:
+                        logger.info("✅ Retrieved page as UTF-8 (%d chars)", len(html_content))
+                        return html_content, 'utf-8'
+
+                    # Try the encoding earlier pages of the same directory turned out to use
+                    prefix = get_base_url(url)
+                    cached_encoding = _PREFIX_ENCODINGS.get(prefix)
+                    if cached_encoding:
+                        try:
+                            html_content = raw_content.decode(cached_encoding)
+                        except UnicodeDecodeError:
+                            html_content = None
+                        if html_content and _validate_decoded_content(html_content, cached_encoding, cached_encoding):
+                            _PREFIX_ENCODINGS.move_to_end(prefix)
+                            logger.info("✅ Retrieved page with %s, as before in %s (%d chars)",
+                                        cached_encoding, prefix, len(html_content))
+                            return html_content, cached_encoding
+
+                    detected = _detect_encoding(raw_content)
+                    encoding = detected['encoding']
+                    confidence = detected['confidence']
+                    
+                    logger.info("📊 Detected encoding: %s (confidence: %.2f)", encoding, confidence)
                 
                 # Try to decode with detected encoding
                 try:
                     html_content = raw_content.decode(encoding)
-                    print(f"✅ Retrieved page ({len(html_content)} chars)")
+                    logger.info("✅ Retrieved page (%d chars)", len(html_content))
+                    if prefix:
+                        _remember_prefix_encoding(prefix, encoding)
                     return html_content, encoding
                 except UnicodeDecodeError as decode_error:
-                    print(f"⚠️ Failed to decode with {encoding}, trying fallback encodings...")
+                    logger.warning("⚠️ Failed to decode with %s, trying fallback encodings...", encoding)
 
                     # Determine appropriate fallback encodings based on initial detection
-                    if encoding and encoding.lower().startswith(('gb', 'big5', 'hz')):
+                    failed_codec = _codec_name(encoding)
+                    if failed_codec in _CHINESE_CODECS:
                         # For Chinese encodings, try other Chinese encodings first
-                        fallback_encodings = ['gbk', 'gb18030', 'big5', 'hz-gb-2312', 'utf-8', 'latin-1']
-                    elif encoding and encoding.lower() in ['koi8-r', 'windows-1251', 'cp1251']:
+                        fallback_encodings = _CHINESE_FALLBACK_ENCODINGS
+                    elif failed_codec in _RUSSIAN_CODECS:
                         # For Russian encodings, try other Russian encodings first
-                        fallback_encodings = ['windows-1251', 'koi8-r', 'cp1251', 'utf-8', 'latin-1']
+                        fallback_encodings = _RUSSIAN_FALLBACK_ENCODINGS
                     else:
                         # General fallback order - prioritize UTF-8 and common encodings
-                        fallback_encodings = ['utf-8', 'windows-1251', 'koi8-r', 'gb2312', 'gbk', 'gb18030', 'latin-1']
+                        fallback_encodings = _DEFAULT_FALLBACK_ENCODINGS
 
                     for fallback_encoding in fallback_encodings:
-                        if fallback_encoding == encoding:
-                            continue  # Skip the encoding that already failed
+                        if _codec_name(fallback_encoding) == failed_codec:
+                            continue  # Skip the encoding that already failed, under any of its names
                         try:
                             html_content = raw_content.decode(fallback_encoding)
-                            print(f"✅ Successfully decoded with {fallback_encoding} ({len(html_content)} chars)")
+                            logger.info("✅ Successfully decoded with %s (%d chars)", fallback_encoding, len(html_content))
 
                             # Additional validation: check if the decoded content makes sense
                             # by looking for common HTML patterns and reasonable character distribution
                             if _validate_decoded_content(html_content, fallback_encoding, encoding):
+                                if prefix:
+                                    _remember_prefix_encoding(prefix, fallback_encoding)
                                 return html_content, fallback_encoding
                             else:
-                                print(f"⚠️ Decoded content with {fallback_encoding} appears corrupted, trying next encoding...")
+                                logger.warning("⚠️ Decoded content with %s appears corrupted, trying next encoding...", fallback_encoding)
                                 continue
 
                         except UnicodeDecodeError:
                             continue
                     
-                    print(f"❌ Could not decode content with any encoding")
+                    logger.warning("❌ Could not decode content with any encoding")
             else:
-                print(f"❌ {url} returned status {response.status}")
+                logger.warning("❌ %s returned status %d", url, response.status)
     except Exception as e:
-        print(f"❌ Error with {url}: {str(e)}")
+        logger.warning("❌ Error with %s: %s", url, e)
     
     return None, None
 
-async def fetch_main_page(urls_to_try, config):
+async def fetch_main_page(urls_to_try, config, ctx=None):
     """
     Fetch the main page using aiohttp
     
     Args:
         urls_to_try (list): List of URLs to try
         config (dict): Configuration dictionary
+        ctx (FetcherContext, optional): Shared session; a temporary one is used if omitted
         
     Returns:
         tuple: (html_content, base_url, encoding) or (None, None, None) if failed
     """
-    # Set up SSL context
-    ssl_context = ssl.create_default_context()
-    ssl_context.check_hostname = False
-    ssl_context.verify_mode = ssl.CERT_NONE
-    
-    headers = {
-        'User-Agent': config['user_agent']
-    }
+    if ctx is None:
+        async with FetcherContext(config) as ctx:
+            return await fetch_main_page(urls_to_try, config, ctx)
+
+    main_html = None
+    base_url = None
+    encoding = None
     
-    async with aiohttp.ClientSession(
-        connector=aiohttp.TCPConnector(ssl=ssl_context),
-        timeout=aiohttp.ClientTimeout(total=20),
-        headers=headers
-    ) as session:
-        
-        main_html = None
-        base_url = None
-        encoding = None
-        
-        for url in urls_to_try:
-            try:
-                print(f"🔍 Analyzing page structure: {url}")
-                html_content, encoding = await fetch_page_with_encoding_detection(url, session)
-                
-                if html_content:
-                    # Check if the page is in the target language
-                    if config.get('language') and not is_target_language(html_content, config['language']):
-                        print(f"⏭️ Skipping main page: not in target language ({config['language']})")
-                        continue
-                    
-                    main_html = html_content
-                    # Extract the base URL correctly
-                    base_url = get_base_url(url)
-                    print(f"📌 Using base URL: {base_url}")
-                    return main_html, base_url, encoding
+    for url in urls_to_try:
+        try:
+            logger.info("🔍 Analyzing page structure: %s", url)
+            html_content, encoding = await fetch_page_with_encoding_detection(
+                url, ctx.session, config.get('trust_http_charset', True)
+            )
+            
+            if html_content:
+                # Check if the page is in the target language
+                if config.get('language') and not is_target_language(html_content, config['language']):
+                    logger.info("⏭️ Skipping main page: not in target language (%s)", config['language'])
+                    continue
                 
-            except Exception as e:
-                print(f"❌ Error with {url}: {str(e)}")
-        
-        print("❌ Could not retrieve main page in target language")
-        return None, None, None
+                main_html = html_content
+                # Extract the base URL correctly
+                base_url = get_base_url(url)
+                logger.info("📌 Using base URL: %s", base_url)
+                return main_html, base_url, encoding
+            
+        except Exception as e:
+            logger.warning("❌ Error with %s: %s", url, e)
+    
+    logger.warning("❌ Could not retrieve main page in target language")
+    return None, None, None
 
 async def create_crawler(config):
     """
@@ -238,7 +582,7 @@ async def crawl_page(crawler, url, config):
         config (dict): Configuration dictionary
         
     Returns:
-        dict: Page result or None if failed
+        PageResult or None: Crawled page, or None if failed
     """
     crawler_config = CrawlerRunConfig(
         delay_before_return_html=config['delay_before_return'],
@@ -257,34 +601,36 @@ async def crawl_page(crawler, url, config):
             is_frame_url = 'frame' in url.lower() or any(frame_indicator in url.lower() for frame_indicator in ['nav', 'menu', 'title'])
             min_text_length = 20 if is_frame_url else 50
             if config.get('language') and not is_target_language(result.html, config['language'], min_text_length, is_frame=is_frame_url):
-                print(f"⏭️ Skipping page: not in target language ({config['language']})")
+                logger.info("⏭️ Skipping page: not in target language (%s)", config['language'])
                 return None
 
-            return {
-                'url': url,
-                'html': result.html,
-                'cleaned_html': result.cleaned_html,
-                'title': result.metadata.get('title', 'No title'),
-                'success': True
-            }
+            return PageResult(
+                url=url,
+                html=result.html,
+                cleaned_html=result.cleaned_html,
+                title=result.metadata.get('title', 'No title')
+            )
         else:
-            print(f"❌ Failed to crawl {url}: {result.error_message}")
+            logger.warning("❌ Failed to crawl %s: %s", url, result.error_message)
             return None
     except Exception as e:
-        print(f"❌ Exception while crawling {url}: {str(e)}")
+        logger.warning("❌ Exception while crawling %s: %s", url, e)
         return None
 
-def extract_main_content(html_content):
+def extract_main_content(html_content, soup=None):
     """
     Extract the main content from an HTML page, excluding frames
     
     Args:
         html_content (str): HTML content
+        soup (BeautifulSoup, optional): Document already parsed with _MAIN_CONTENT_PARSER;
+            its frames are removed in place
         
     Returns:
         str: Main content HTML
     """
-    soup = BeautifulSoup(html_content, 'html.parser')
+    if soup is None:
+        soup = BeautifulSoup(html_content, _MAIN_CONTENT_PARSER)
     
     # Remove all frames and iframes from the soup
     for frame in soup.find_all(['frame', 'iframe']):
@@ -299,7 +645,83 @@ def extract_main_content(html_content):
         # If no body tag, return the whole content
         return html_content
 
-async def fetch_page_with_frames(url, base_url, config):
+def is_crawlable_frame_src(src):
+    """
+    Check if a frame source can point to a page worth crawling
+
+    Args:
+        src (str): Value of the frame's src attribute
+
+    Returns:
+        bool: False for empty sources, fragments and javascript:, data:, mailto: or about: URLs
+    """
+    return bool(src) and not _BAD_SCHEME_RE.match(src)
+
+async def iter_frame_contents(crawler, url, frames, base_url, config):
+    """
+    Crawl a page's frames concurrently and yield their contents in page order
+
+    Args:
+        crawler (AsyncWebCrawler): Started web crawler
+        url (str): URL of the page containing the frames
+        frames (list): Frame elements of the page
+        base_url (str): Base URL of the site
+        config (dict): Configuration dictionary
+
+    Yields:
+        tuple: (index, FrameResult) for each frame that was crawled successfully
+    """
+    # Get the correct base URL for this page
+    page_base_url = get_base_url(url)
+    logger.info("📌 Using page base URL for frames: %s", page_base_url)
+    
+    # Collect the frames to crawl, each source once
+    frame_tasks = []
+    seen_srcs = set()
+    for i, frame in enumerate(frames):
+        src = frame.get('src', '')
+        if is_crawlable_frame_src(src) and src not in seen_srcs:
+            seen_srcs.add(src)
+            
+            # Build absolute URL correctly using urljoin
+            frame_url = urljoin(page_base_url, src)
+            logger.info("🔗 Frame source: %s -> %s", src, frame_url)
+            
+            # Skip external domains
+            if not is_same_domain(frame_url, base_url):
+                logger.info("⏭️ Skipping external frame: %s", frame_url)
+                continue
+            
+            frame_tasks.append((i, frame, frame_url))
+    
+    # Crawl the frames concurrently, a bounded number at a time
+    semaphore = asyncio.Semaphore(config.get('frame_concurrency', DEFAULT_FRAME_CONCURRENCY))
+    
+    async def _crawl_frame(i, frame_url):
+        async with semaphore:
+            logger.info("🔄 Accessing frame %d in %s: %s", i+1, url, frame_url)
+            return await crawl_page(crawler, frame_url, config)
+    
+    tasks = [asyncio.ensure_future(_crawl_frame(i, frame_url)) for i, _, frame_url in frame_tasks]
+    try:
+        # Yield each frame once it and all frames before it are done
+        for (i, frame, frame_url), task in zip(frame_tasks, tasks):
+            frame_result = await task
+            if frame_result:
+                yield i, FrameResult(
+                    number=i+1,
+                    name=frame.get('name', f'frame_{i+1}'),
+                    url=frame_url,
+                    content=frame_result.cleaned_html,
+                    html=frame_result.html,
+                    title=frame_result.title
+                )
+    finally:
+        # Don't leave frames crawling if the caller stops early
+        for task in tasks:
+            task.cancel()
+
+async def fetch_page_with_frames(url, base_url, config, ctx=None):
     """
     Fetch a page and handle frames if present
     
@@ -307,128 +729,101 @@ async def fetch_page_with_frames(url, base_url, config):
         url (str): URL to fetch
         base_url (str): Base URL of the site
         config (dict): Configuration dictionary
+        ctx (FetcherContext, optional): Shared session and crawler; a temporary one is used if omitted
         
     Returns:
         dict: Page result with frames or None if failed
     """
-    # Set up SSL context
-    ssl_context = ssl.create_default_context()
-    ssl_context.check_hostname = False
-    ssl_context.verify_mode = ssl.CERT_NONE
+    if ctx is None:
+        async with FetcherContext(config) as ctx:
+            return await fetch_page_with_frames(url, base_url, config, ctx)
+
+    # First try to fetch the page directly
+    html_content, encoding = await fetch_page_with_encoding_detection(
+        url, ctx.session, config.get('trust_http_charset', True)
+    )
     
-    headers = {
-        'User-Agent': config['user_agent']
-    }
+    if not html_content:
+        return None
+    
+    # Check if the page is in the target language
+    # Use more lenient language detection for frames (they often have minimal text)
+    is_frame_url = 'frame' in url.lower() or any(frame_indicator in url.lower() for frame_indicator in ['nav', 'menu', 'title'])
+    min_text_length = 20 if is_frame_url else 50
+    if config.get('language') and not is_target_language(html_content, config['language'], min_text_length, is_frame=is_frame_url):
+        logger.info("⏭️ Skipping page: not in target language (%s)", config['language'])
+        return None
     
-    async with aiohttp.ClientSession(
-        connector=aiohttp.TCPConnector(ssl=ssl_context),
-        timeout=aiohttp.ClientTimeout(total=20),
-        headers=headers
-    ) as session:
+    # Check if the page has frames; most pages have none, and those are
+    # not parsed at all
+    if _FRAME_TAG_RE.search(html_content):
+        soup = BeautifulSoup(html_content, _MAIN_CONTENT_PARSER)
+        frames = soup.find_all(['frame', 'iframe'])
+    else:
+        soup = None
+        frames = []
+    
+    if frames:
+        logger.info("🔍 Found %d frames in %s", len(frames), url)
         
-        # First try to fetch the page directly
-        html_content, encoding = await fetch_page_with_encoding_detection(url, session)
+        # Extract the main content (excluding frames), reusing the parsed page
+        main_content = extract_main_content(html_content, soup)
         
-        if not html_content:
-            return None
+        # Reuse the run's browser crawler for the frames
+        crawler = await ctx.get_crawler()
+        frame_contents = []
         
-        # Check if the page is in the target language
-        # Use more lenient language detection for frames (they often have minimal text)
-        is_frame_url = 'frame' in url.lower() or any(frame_indicator in url.lower() for frame_indicator in ['nav', 'menu', 'title'])
-        min_text_length = 20 if is_frame_url else 50
-        if config.get('language') and not is_target_language(html_content, config['language'], min_text_length, is_frame=is_frame_url):
-            print(f"⏭️ Skipping page: not in target language ({config['language']})")
-            return None
+        # Combine main content and frame contents
+        parts = [f"<h1>Page with {len(frames)} frames</h1>\n\n"]
+        append = parts.append
         
-        # Check if the page has frames
-        soup = BeautifulSoup(html_content, 'html.parser')
-        frames = soup.find_all(['frame', 'iframe'])
+        # First add the main content of the page (excluding frames)
+        append(f"<h2>Main Page Content</h2>\n")
+        append(f"<div class='main-content'>{main_content}</div>\n\n")
         
-        if frames:
-            print(f"🔍 Found {len(frames)} frames in {url}")
-            
-            # Extract the main content (excluding frames)
-            main_content = extract_main_content(html_content)
-            
-            # Create a crawler to handle frames
-            async with await create_crawler(config) as crawler:
-                frame_contents = []
-                
-                # Get the correct base URL for this page
-                page_base_url = get_base_url(url)
-                print(f"📌 Using page base URL for frames: {page_base_url}")
-                
-                for i, frame in enumerate(frames):
-                    src = frame.get('src', '')
-                    if src and not src.startswith('javascript:') and src != 'about:blank':
-                        # Build absolute URL correctly using urljoin
-                        frame_url = urljoin(page_base_url, src)
-                        print(f"🔗 Frame source: {src} -> {frame_url}")
-                        
-                        # Skip external domains
-                        if not is_same_domain(frame_url, base_url):
-                            print(f"⏭️ Skipping external frame: {frame_url}")
-                            continue
-                        
-                        print(f"🔄 Accessing frame {i+1} in {url}: {frame_url}")
-                        
-                        # Crawl the frame
-                        frame_result = await crawl_page(crawler, frame_url, config)
-                        
-                        if frame_result:
-                            frame_name = frame.get('name', f'frame_{i+1}')
-                            frame_contents.append({
-                                'number': i+1,
-                                'name': frame_name,
-                                'url': frame_url,
-                                'content': frame_result['cleaned_html'],
-                                'html': frame_result['html'],
-                                'title': frame_result['title']
-                            })
-                
-                # Combine main content and frame contents
-                combined_content = f"<h1>Page with {len(frames)} frames</h1>\n\n"
-                
-                # First add the main content of the page (excluding frames)
-                combined_content += f"<h2>Main Page Content</h2>\n"
-                combined_content += f"<div class='main-content'>{main_content}</div>\n\n"
-                
-                # Then add frame contents
-                for frame in frame_contents:
-                    combined_content += f"<h2>Frame {frame['number']}: {frame['name']}</h2>\n"
-                    combined_content += f"<div class='frame-content'>{frame['content']}</div>\n\n"
-                
-                # Get title from the main page or first frame
-                title = soup.find('title')
-                title_text = title.get_text().strip() if title else (
-                    frame_contents[0]['title'] if frame_contents else "No title"
-                )
-                
-                return {
-                    'url': url,
-                    'html': html_content,
-                    'cleaned_html': combined_content,
-                    'title': title_text,
-                    'has_frames': True,
-                    'frames': frame_contents,
-                    'main_content': main_content,
-                    'encoding': encoding,
-                    'success': True
-                }
+        # Then add frame contents as they arrive
+        async for _, frame in iter_frame_contents(crawler, url, frames, base_url, config):
+            frame_contents.append(frame)
+            append(f"<h2>Frame {frame.number}: {frame.name}</h2>\n")
+            append(f"<div class='frame-content'>{frame.content}</div>\n\n")
+        
+        combined_content = ''.join(parts)
+        
+        # Get title from the main page or first frame
+        title = soup.find('title')
+        title_text = title.get_text().strip() if title else (
+            frame_contents[0].title if frame_contents else "No title"
+        )
+        
+        return {
+            'url': url,
+            'html': html_content,
+            'cleaned_html': combined_content,
+            'title': title_text,
+            'has_frames': True,
+            'frames': frame_contents,
+            'main_content': main_content,
+            'encoding': encoding,
+            'success': True
+        }
+    else:
+        # No frames, return the page as is
+        if soup is None:
+            title = _TITLE_RE.search(html_content)
+            title_text = html.unescape(title.group(1)).strip() if title else "No title"
         else:
-            # No frames, return the page as is
             title = soup.find('title')
             title_text = title.get_text().strip() if title else "No title"
-            
-            return {
-                'url': url,
-                'html': html_content,
-                'cleaned_html': html_content,  # No cleaning for now
-                'title': title_text,
-                'has_frames': False,
-                'encoding': encoding,
-                'success': True
-            }
+        
+        return {
+            'url': url,
+            'html': html_content,
+            'cleaned_html': html_content,  # No cleaning for now
+            'title': title_text,
+            'has_frames': False,
+            'encoding': encoding,
+            'success': True
+        }
 
 def extract_frames(html):
     """
@@ -438,12 +833,14 @@ def extract_frames(html):
         html (str): HTML content
         
     Returns:
-        list: List of frame elements
+        tuple: (soup, frames) - the page's title, meta and frame tags, so callers can
+        reuse the parse, and the list of frame elements
     """
-    soup = BeautifulSoup(html, 'html.parser')
+    # Only the needed tags are built, not the whole document tree
+    soup = BeautifulSoup(html, HTML_PARSER, parse_only=_FRAME_PAGE_TAGS)
     frames = soup.find_all(['frame', 'iframe'])
     
-    print(f"\n🔍 Frame structure analysis:")
-    print(f"Total frames found: {len(frames)}")
+    logger.info("\n🔍 Frame structure analysis:")
+    logger.info("Total frames found: %d", len(frames))
     
-    return frames
\ No newline at end of file
+    return soup, frames
@@ -0,0 +1,62 @@
+"""
+Regression checks for frameset pages
+
+Run with: python -m unittest test_frames
+"""
+
+import importlib.util
+import unittest
+
+from improved_link_fixer import ImprovedLinkFixer
+from link_extractor import extract_links_from_html
+
+# A frameset page with the usual <noframes> fallback body
+FRAMESET_PAGE = """<html>
+<head><title>Frames</title></head>
+<frameset cols="20%,80%">
+<frame src="menu.htm" name="menu">
+<frame src="main.htm" name="main">
+</frameset>
+<noframes><body>
+<p>Your browser does not support frames.</p>
+<a href="news.htm">News</a> <a href="about.htm">About</a>
+</body></noframes>
+</html>"""
+
+CONFIG = {
+    'skip_extensions': ['.pdf'],
+    'skip_patterns': ['/admin/'],
+    'exclude_domains': [''],
+}
+
+class NoframesLinksTest(unittest.TestCase):
+    """Links inside <noframes> are found like any others"""
+
+    def test_extract_links_from_html(self):
+        links = extract_links_from_html(FRAMESET_PAGE, 'http://example.com/', 'http://example.com/index.htm', CONFIG)
+        self.assertEqual(
+            sorted(link.url for link in links),
+            ['http://example.com/about.htm', 'http://example.com/main.htm',
+             'http://example.com/menu.htm', 'http://example.com/news.htm'],
+        )
+        self.assertIn('News', [link.text for link in links])
+
+    def test_link_fixer_anchor_hrefs(self):
+        fixer = ImprovedLinkFixer()
+        self.assertEqual(list(fixer._iter_anchor_hrefs(FRAMESET_PAGE)), ['news.htm', 'about.htm'])
+
+@unittest.skipUnless(importlib.util.find_spec('crawl4ai'), 'page_fetcher needs crawl4ai')
+class NoframesMainContentTest(unittest.TestCase):
+    """The <noframes> body is the main content of a frameset page"""
+
+    def test_extract_main_content(self):
+        from page_fetcher import extract_main_content
+
+        main_content = extract_main_content(FRAMESET_PAGE)
+        self.assertTrue(main_content.startswith('<body>'))
+        self.assertIn('<a href="news.htm">News</a>', main_content)
+        self.assertNotIn('<frame', main_content)
+        self.assertNotIn('<head>', main_content)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,7 +1,75 @@
+import logging
 import os
 import re
+import time
 import urllib.parse
-from datetime import datetime
+from functools import lru_cache
+
+logger = logging.getLogger(__name__)
+
+# BeautifulSoup parser for read-only parsing: lxml when installed, which is
+# much faster than the pure Python html.parser
+try:
+    from lxml import etree as lxml_etree
+    from lxml import html as lxml_html
+    HTML_PARSER = 'lxml'
+except ImportError:
+    lxml_etree = lxml_html = None
+    HTML_PARSER = 'html.parser'
+
+# lxml refuses str input that carries an XML encoding declaration
+_XML_DECLARATION_RE = re.compile(r'^\s*<\?xml[^>]*\?>')
+
+# Characters not allowed in generated filenames (\w already covers '_')
+_UNSAFE_FILENAME_RE = re.compile(r'[^\w\-.]')
+
+# The same replacement as a byte table for ASCII names, which are the common
+# case and much faster to translate than to run through the regex
+_FILENAME_BYTES = bytes(
+    c if chr(c).isalnum() or chr(c) in '-_.' else ord('_') for c in range(128)
+) + b'_' * 128
+
+def parse_lxml_html(html):
+    """
+    Parse an HTML document or fragment with lxml
+
+    Args:
+        html (str): HTML content
+
+    Returns:
+        lxml.html.HtmlElement or None: Root element, or None if lxml is not
+        installed or the content has no elements
+    """
+    if lxml_html is None or not html or html.isspace():
+        return None
+
+    try:
+        return lxml_html.fromstring(_XML_DECLARATION_RE.sub('', html, count=1))
+    except (lxml_etree.ParserError, ValueError):
+        return None
+
+def iter_lxml_elements(root, *tags):
+    """
+    Iterate over the elements with the given tags in document order,
+    including those inside <noframes>
+
+    lxml keeps the content of <noframes> as raw text rather than parsing it
+    (html.parser does parse it), so that text is parsed separately here.
+
+    Args:
+        root (lxml.html.HtmlElement): Root element, as returned by parse_lxml_html
+        *tags (str): Tag names to find
+
+    Returns:
+        iterator: Matching lxml elements
+    """
+    for element in root.iter(*tags, 'noframes'):
+        if element.tag != 'noframes':
+            yield element
+            continue
+        inner = parse_lxml_html(element.text)
+        if inner is not None:
+            yield from iter_lxml_elements(inner, *tags)
 
 def create_output_directory(output_dir):
     """
@@ -13,14 +81,51 @@ def create_output_directory(output_dir):
     Returns:
         str: Absolute path to the output directory
     """
-    if not os.path.exists(output_dir):
+    # Creating it straight away tells whether it existed, without a separate
+    # (and racy) existence check
+    try:
         os.makedirs(output_dir)
-        print(f"📁 Created output directory: {output_dir}")
-    else:
-        print(f"📁 Using existing output directory: {output_dir}")
+        logger.info("📁 Created output directory: %s", output_dir)
+    except FileExistsError:
+        logger.info("📁 Using existing output directory: %s", output_dir)
     
     return os.path.abspath(output_dir)
 
+# Plain http(s) URLs whose path can be read off directly: ASCII host, and no
+# query, fragment, parameters or characters urlsplit would clean up
+_PLAIN_URL_RE = re.compile(r"https?://[A-Za-z0-9.:@%+!$&'()*,=~_-]*(/[^?#;\x00-\x20]*)?\Z", re.IGNORECASE)
+
+# Inputs that are already a bare path or name (no scheme, host, query,
+# fragment or parameters), which urlsplit would return unchanged
+_PLAIN_PATH_RE = re.compile(r'(?!//)[^:?#;\x00-\x20]*\Z')
+
+@lru_cache(maxsize=256)
+def _url_path(url):
+    """
+    Get the path of a URL, parsing each distinct URL only once
+
+    Args:
+        url (str): URL to parse
+
+    Returns:
+        str: Path component of the URL, without ;parameters of its last segment
+    """
+    match = _PLAIN_URL_RE.match(url)
+    if match:
+        return match.group(1) or ''
+    if _PLAIN_PATH_RE.match(url):
+        return url
+
+    # urlsplit is cheaper than urlparse, which only adds splitting off the
+    # parameters of the last segment
+    parts = urllib.parse.urlsplit(url)
+    path = parts.path
+    if parts.scheme in urllib.parse.uses_params:
+        params = path.find(';', max(path.rfind('/'), 0))
+        if params >= 0:
+            return path[:params]
+    return path
+
 def create_safe_filename(url, prefix='', max_length=50):
     """
     Create a safe filename from a URL
@@ -34,18 +139,20 @@ def create_safe_filename(url, prefix='', max_length=50):
         str: Safe filename
     """
     # Parse the URL and get the path
-    parsed_url = urllib.parse.urlparse(url)
-    path_part = parsed_url.path.rstrip('/')
+    path_part = _url_path(url).rstrip('/')
     
     # Use 'index' if the path is empty
     if not path_part:
         path_part = 'index'
     
     # Get the last part of the path
-    filename = path_part.split('/')[-1]
+    filename = path_part.rsplit('/', 1)[-1]
     
     # Replace non-alphanumeric characters with underscores
-    safe_name = re.sub(r'[^\w\-_\.]', '_', filename)
+    if filename.isascii():
+        safe_name = filename.encode('ascii').translate(_FILENAME_BYTES).decode('ascii')
+    else:
+        safe_name = _UNSAFE_FILENAME_RE.sub('_', filename)
     
     # Add prefix if provided
     if prefix:
@@ -53,11 +160,39 @@ def create_safe_filename(url, prefix='', max_length=50):
     
     # Limit the length
     if len(safe_name) > max_length:
-        extension = os.path.splitext(safe_name)[1]
-        safe_name = safe_name[:max_length-len(extension)] + extension
+        # Keep the extension: the part from the last dot, unless only dots
+        # precede it (as os.path.splitext has it)
+        dot = safe_name.rfind('.')
+        if dot > len(safe_name) - len(safe_name.lstrip('.')):
+            safe_name = safe_name[:max_length - (len(safe_name) - dot)] + safe_name[dot:]
+        else:
+            safe_name = safe_name[:max_length]
     
     return safe_name
 
+# Formats of the timestamps used in file names and in file contents
+TIMESTAMP_FORMAT = "%Y%m%d_%H%M%S"
+DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Current second and its formatted timestamp and datetime, as
+# [second, timestamp, datetime]; both formats have one-second resolution, so
+# they are formatted together and only again when the second changes
+_current_times = [None, '', '']
+
+def _formatted_now():
+    """
+    Get the current time in both formats, reformatting only when the second changes
+
+    Returns:
+        list: [second, timestamp, datetime] for the current second
+    """
+    second = int(time.time())
+    current = _current_times
+    if current[0] != second:
+        now = time.localtime(second)
+        current[:] = [second, time.strftime(TIMESTAMP_FORMAT, now), time.strftime(DATETIME_FORMAT, now)]
+    return current
+
 def get_timestamp():
     """
     Get the current timestamp in a format suitable for filenames
@@ -65,7 +200,7 @@ def get_timestamp():
     Returns:
         str: Current timestamp
     """
-    return datetime.now().strftime("%Y%m%d_%H%M%S")
+    return _formatted_now()[1]
 
 def get_formatted_datetime():
     """
@@ -74,4 +209,4 @@ def get_formatted_datetime():
     Returns:
         str: Formatted datetime
     """
-    return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
\ No newline at end of file
+    return _formatted_now()[2]
\ No newline at end of file